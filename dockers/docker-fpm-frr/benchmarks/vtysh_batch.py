@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""Measure the bring-up time of BGP neighbors, written one by one or batched.
+
+NEIGHBORS neighbors are added by ConfigMgr of bgpcfgd:
+    single    push() of each neighbor, one vtysh call per neighbor
+    batched   push() of each neighbor with a callback, then commit(), one
+              vtysh call per BATCH_MAX_SIZE neighbors
+vtysh is replaced by a stub, which takes STARTUP ms per call, as the real
+vtysh connects to all the FRR daemons. It tracks the CLI node as vtysh does
+and reports an error for each line with an unknown command or a command
+which is not valid in the current node. FAILURES neighbors have such a line,
+the neighbors reported as failed must be the same for both methods.
+
+Before the measure, a batch where the 'router bgp' line of a change fails is
+written, the neighbors of that change must be reported as failed and must
+not be configured in the BGP instance of the previous change.
+
+Usage:
+    benchmarks/vtysh_batch.py [-n NEIGHBORS] [-f FAILURES] [-s STARTUP]
+"""
+
+from __future__ import print_function
+
+import argparse
+import imp
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+
+BGPCFGD = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bgpcfgd')
+
+VTYSH = """#!%s
+import os
+import sys
+import time
+
+CONFIG, ENABLE, BGP, AF = 'config', 'enable', 'bgp', 'af'
+
+
+def execute(node, instance, words):
+    if words[0] == 'end' and node != ENABLE:
+        return ENABLE, None
+    if words[:2] == ['configure', 'terminal'] and node == ENABLE:
+        return CONFIG, None
+    if words[:2] == ['router', 'bgp'] and node in (CONFIG, BGP, AF) and 'unknown-vrf' not in words:
+        return BGP, ' '.join(words[2:])
+    if words[0] == 'address-family' and node == BGP:
+        return AF, instance
+    if words[0] == 'exit-address-family' and node == AF:
+        return BGP, instance
+    if words[0] == 'neighbor' and node in (BGP, AF) and 'unknown-command' not in words:
+        with open(os.environ['VTYSH_LOG'], 'a') as fp:
+            fp.write('%%s|%%s\\n' %% (instance, ' '.join(words)))
+        return node, instance
+    return None
+
+
+time.sleep(%f)
+if sys.argv[1] == '-f':
+    rc = 0
+    node, instance = CONFIG, None
+    with open(sys.argv[2]) as fp:
+        for lineno, line in enumerate(fp, 1):
+            if not line.strip() or line.strip().startswith('!'):
+                continue
+            result = execute(node, instance, line.split())
+            if result is None:
+                sys.stderr.write('line %%d: %%%% Unknown command[4]: %%s' %% (lineno, line))
+                rc = 13
+            else:
+                node, instance = result
+    sys.exit(rc)
+"""
+
+
+def make_vtysh(path, startup):
+    vtysh = os.path.join(path, 'vtysh')
+    with open(vtysh, 'w') as fp:
+        fp.write(VTYSH % (sys.executable, startup / 1000.0))
+    os.chmod(vtysh, os.stat(vtysh).st_mode | stat.S_IXUSR)
+
+
+def make_neighbor(i, fail, vrf=None):
+    nbr = '10.0.%d.%d' % (i // 128, (i % 128) * 2 + 1)
+    cmd = ['router bgp 65100' + (' vrf %s' % vrf if vrf else ''),
+           '  neighbor %s remote-as 65200' % nbr,
+           '  neighbor %s description ARISTA%02dT0' % (nbr, i),
+           '  neighbor %s timers 3 10' % nbr,
+           '  address-family ipv4',
+           '    neighbor %s peer-group PEER_V4' % nbr,
+           '    neighbor %s activate' % nbr,
+           '  exit-address-family']
+    if fail:
+        cmd.insert(3, '  neighbor %s unknown-command' % nbr)
+    return nbr, '\n'.join(cmd)
+
+
+def run_single(cfg_mgr, neighbors):
+    return set(nbr for nbr, cmd in neighbors if not cfg_mgr.push(cmd))
+
+
+def run_batched(cfg_mgr, neighbors):
+    failed = set()
+    for nbr, cmd in neighbors:
+        cfg_mgr.push(cmd, lambda ret_code, nbr=nbr: ret_code or failed.add(nbr))
+    cfg_mgr.commit()
+    return failed
+
+
+def check_failed_instance(bgpcfgd, log):
+    neighbors = [make_neighbor(0, False), make_neighbor(1, False, 'unknown-vrf'), make_neighbor(2, False, 'Vrf1')]
+    failed = run_batched(bgpcfgd.ConfigMgr(), neighbors)
+    with open(log) as fp:
+        applied = set(line.split('|')[1].split()[1] for line in fp)
+    os.remove(log)
+    if failed != set([neighbors[1][0]]) or applied != set([neighbors[0][0], neighbors[2][0]]):
+        print('check: failed neighbors {}, configured neighbors {}, the neighbor {} of the failed instance '
+              'must be failed and not configured'.format(sorted(failed), sorted(applied), neighbors[1][0]),
+              file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched writes of bgpcfgd to vtysh")
+    parser.add_argument('-n', '--neighbors', type=int, default=256)
+    parser.add_argument('-f', '--failures', type=int, default=2)
+    parser.add_argument('-s', '--startup', type=float, default=20.0, help='ms taken by each vtysh call')
+    args = parser.parse_args()
+
+    sys.dont_write_bytecode = True  # no bgpcfgdc next to bgpcfgd
+    bgpcfgd = imp.load_source('bgpcfgd', BGPCFGD)
+    bgpcfgd.syslog.openlog('vtysh_batch')
+    step = max(args.neighbors // max(args.failures, 1), 1)
+    neighbors = [make_neighbor(i, i % step == step - 1 and i // step < args.failures)
+                 for i in range(args.neighbors)]
+    expected = set(nbr for nbr, cmd in neighbors if 'unknown-command' in cmd)
+
+    path = tempfile.mkdtemp()
+    os.environ['PATH'] = path + os.pathsep + os.environ['PATH']
+    os.environ['VTYSH_LOG'] = os.path.join(path, 'vtysh.log')
+    try:
+        make_vtysh(path, args.startup)
+        check_failed_instance(bgpcfgd, os.environ['VTYSH_LOG'])
+        print('{} neighbors, {} failures, vtysh startup {} ms'.format(args.neighbors, len(expected), args.startup))
+        print('{:<10} {:>12} {:>12}'.format('method', 'total ms', 'ms/neighbor'))
+        for name, run in [('single', run_single), ('batched', run_batched)]:
+            start = time.time()
+            failed = run(bgpcfgd.ConfigMgr(), neighbors)
+            elapsed = time.time() - start
+            if failed != expected:
+                print('{}: failed neighbors {} instead of {}'.format(name, sorted(failed), sorted(expected)),
+                      file=sys.stderr)
+                sys.exit(1)
+            print('{:<10} {:>12.1f} {:>12.2f}'.format(name, elapsed * 1000, elapsed * 1000 / args.neighbors))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
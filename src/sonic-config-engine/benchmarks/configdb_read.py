@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Measure the ways sonic-cfggen -d reads CONFIG_DB.
+
+CONFIG_DB is filled with the config generated from the t1 sample minigraph,
+then the harness times:
+    full        ConfigDBConnector.get_config(), what -d always did before
+    selective   reading only DEVICE_METADATA, as for
+                '-d -v DEVICE_METADATA.localhost.hwsku'
+    snapshot    ConfigDBSnapshot.get_config() with CONFIG_DB unchanged,
+                as in 'sonic-cfggen --server'
+    changed     ConfigDBSnapshot.get_config() right after a CONFIG_DB change,
+                which must return the changed entry
+
+The harness FLUSHES CONFIG_DB of the redis server it is pointed at, so only
+run it against a scratch redis instance.
+
+Usage:
+    benchmarks/configdb_read.py -s /path/to/scratch/redis.sock [-n RUNS]
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+TESTS_DIR = os.path.join(ENGINE_DIR, 'tests')
+sys.path.insert(0, ENGINE_DIR)
+
+from swsssdk import ConfigDBConnector
+
+import configdb_snapshot
+import minigraph
+
+
+def populate(configdb):
+    with open(os.devnull, 'w') as devnull:
+        stderr, sys.stderr = sys.stderr, devnull
+        try:
+            data = minigraph.parse_xml(os.path.join(TESTS_DIR, 't1-sample-graph-mlnx.xml'))
+        finally:
+            sys.stderr = stderr
+    configdb.get_redis_client(configdb.db_name).flushdb()
+    configdb.mod_config(dict((t, v) for t, v in data.items() if t[0].isupper()))
+
+
+def timed(func, runs):
+    start = time.time()
+    for _ in range(runs):
+        func()
+    return (time.time() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CONFIG_DB reads of sonic-cfggen -d")
+    parser.add_argument('-s', '--redis-unix-sock-file', required=True, help='unix socket of a scratch redis server')
+    parser.add_argument('-n', '--runs', type=int, default=100)
+    args = parser.parse_args()
+
+    configdb = ConfigDBConnector(unix_socket_path=args.redis_unix_sock_file)
+    configdb.connect(False)
+    populate(configdb)
+    client = configdb.get_redis_client(configdb.db_name)
+    print('CONFIG_DB: {} keys'.format(client.dbsize()))
+
+    snapshot = configdb_snapshot.ConfigDBSnapshot(configdb)
+    if not configdb_snapshot.notifications_enabled(client):
+        print('keyspace notifications are disabled, the snapshot is never reused')
+    snapshot.get_config()
+
+    changed = 0
+    metadata = configdb.get_entry('DEVICE_METADATA', 'localhost')
+    for i in range(args.runs):
+        metadata['bgp_asn'] = str(65000 + i)
+        configdb.set_entry('DEVICE_METADATA', 'localhost', metadata)
+        start = time.time()
+        config = snapshot.get_config()
+        changed += (time.time() - start) * 1000 / args.runs
+        if config['DEVICE_METADATA']['localhost'] != metadata:
+            print('stale snapshot after change {}'.format(i), file=sys.stderr)
+            sys.exit(1)
+
+    results = [
+        ('full', timed(configdb.get_config, args.runs)),
+        ('selective', timed(lambda: configdb_snapshot.get_tables(configdb, ['DEVICE_METADATA']), args.runs)),
+        ('snapshot', timed(snapshot.get_config, args.runs)),
+        ('changed', changed),
+    ]
+    for name, elapsed in results:
+        print('{:<12} {:>10.3f} ms'.format(name, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Compare wall time and peak RSS of minigraph.parse_xml (DOM) and
+minigraph.parse_xml_streaming (iterparse).
+
+Each measurement runs in its own process so that ru_maxrss reflects a
+single parser. By default the test graphs are used, plus a synthetic large
+graph built by replicating the PngDec devices and links of the t1 graph.
+
+Usage:
+    benchmarks/minigraph_parse.py [-n RUNS] [--copies N] [minigraph.xml ...]
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+TESTS_DIR = os.path.join(ENGINE_DIR, 'tests')
+sys.path.insert(0, ENGINE_DIR)
+
+DEFAULT_GRAPHS = [
+    ('t0-sample-graph.xml', 't0-sample-port-config.ini', None),
+    ('t1-sample-graph-mlnx.xml', None, None),
+    ('t2-chassis-fe-graph.xml', 't2-chassis-fe-port-config.ini', None),
+    ('multi_npu_data/sample-minigraph.xml', 'multi_npu_data/sample_port_config-0.ini', 'asic0'),
+]
+
+
+def make_large_graph(src, dst, copies):
+    """ Write a copy of src with every PngDec device and link repeated copies times """
+    from lxml import etree as ET
+    from minigraph import ns
+
+    tree = ET.parse(src)
+    png = tree.getroot().find('{%s}PngDec' % ns)
+    for parent_tag, child_tag in [('Devices', 'Device'), ('DeviceInterfaceLinks', 'DeviceLinkBase')]:
+        parent = png.find('{%s}%s' % (ns, parent_tag))
+        originals = parent.findall('{%s}%s' % (ns, child_tag))
+        for i in range(copies):
+            for element in originals:
+                element = copy.deepcopy(element)
+                for name_tag in ['Hostname', 'StartDevice', 'EndDevice']:
+                    node = element.find('{%s}%s' % (ns, name_tag))
+                    if node is not None:
+                        node.text = '{}-copy{}'.format(node.text, i)
+                parent.append(element)
+    tree.write(dst)
+
+
+def run_one(parser, graph, port_config, asic_name, runs):
+    import minigraph
+    parse = getattr(minigraph, parser)
+    start = time.time()
+    for _ in range(runs):
+        parse(graph, port_config_file=port_config, asic_name=asic_name)
+    elapsed = (time.time() - start) / runs
+    print(json.dumps({'time_ms': elapsed * 1000,
+                      'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+
+def measure(parser, graph, port_config, asic_name, runs):
+    cmd = [sys.executable, os.path.realpath(__file__), '--run', parser, '-n', str(runs), graph]
+    if port_config:
+        cmd += ['--port-config', port_config]
+    if asic_name:
+        cmd += ['--asic', asic_name]
+    with open(os.devnull, 'w') as devnull:
+        return json.loads(subprocess.check_output(cmd, stderr=devnull))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark minigraph DOM and streaming parsers")
+    parser.add_argument('graphs', nargs='*', help='minigraph files, default to the test graphs')
+    parser.add_argument('-n', '--runs', type=int, default=20, help='parses per measurement')
+    parser.add_argument('--copies', type=int, default=200, help='PngDec replication factor of the synthetic graph, 0 to skip it')
+    parser.add_argument('-p', '--port-config')
+    parser.add_argument('--asic')
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(args.run, args.graphs[0], args.port_config, args.asic, args.runs)
+        return
+
+    if args.graphs:
+        graphs = [(g, args.port_config, args.asic) for g in args.graphs]
+    else:
+        graphs = [(os.path.join(TESTS_DIR, g), p and os.path.join(TESTS_DIR, p), a) for g, p, a in DEFAULT_GRAPHS]
+
+    tmp_graph = None
+    if args.copies and not args.graphs:
+        tmp_graph = tempfile.NamedTemporaryFile(suffix='.xml', delete=False).name
+        make_large_graph(os.path.join(TESTS_DIR, 't1-sample-graph-mlnx.xml'), tmp_graph, args.copies)
+        graphs.append((tmp_graph, None, None))
+
+    try:
+        print('{:<40} {:>10} {:>12} {:>12} {:>12} {:>12}'.format(
+            'graph', 'size KB', 'dom ms', 'stream ms', 'dom RSS KB', 'stream RSS KB'))
+        for graph, port_config, asic_name in graphs:
+            dom = measure('parse_xml', graph, port_config, asic_name, args.runs)
+            stream = measure('parse_xml_streaming', graph, port_config, asic_name, args.runs)
+            name = 'synthetic x{}'.format(args.copies) if graph == tmp_graph else os.path.relpath(graph, TESTS_DIR)
+            print('{:<40} {:>10} {:>12.2f} {:>12.2f} {:>12} {:>12}'.format(
+                name, os.path.getsize(graph) / 1024,
+                dom['time_ms'], stream['time_ms'], dom['maxrss_kb'], stream['maxrss_kb']))
+    finally:
+        if tmp_graph:
+            os.remove(tmp_graph)
+
+
+if __name__ == '__main__':
+    main()
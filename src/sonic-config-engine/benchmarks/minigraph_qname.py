@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Profile the share of minigraph.parse_xml time spent building qualified
+tag names (lxml QName objects and their '{namespace}tag' strings).
+
+For every test graph the harness counts the QName constructions made by
+the first parse in the process and by the following ones, and multiplies
+them by the measured cost of a single 'str(QName(ns, tag))'. Pass
+--engine-dir to profile another checkout of src/sonic-config-engine, e.g. a
+git worktree of an older revision, to compare before and after.
+
+Usage:
+    benchmarks/minigraph_qname.py [-n RUNS] [--engine-dir DIR] [minigraph.xml ...]
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+import timeit
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+TESTS_DIR = os.path.join(ENGINE_DIR, 'tests')
+
+DEFAULT_GRAPHS = [
+    ('t0-sample-graph.xml', 't0-sample-port-config.ini', None),
+    ('t1-sample-graph-mlnx.xml', None, None),
+    ('t2-chassis-fe-graph.xml', 't2-chassis-fe-port-config.ini', None),
+    ('multi_npu_data/sample-minigraph.xml', 'multi_npu_data/sample_port_config-0.ini', 'asic0'),
+]
+
+
+class CountingQName(object):
+    """ Stand-in for lxml QName which counts its constructions """
+    count = 0
+    qname = None
+
+    def __new__(cls, *args):
+        CountingQName.count += 1
+        return CountingQName.qname(*args)
+
+
+def parse(minigraph, graph, port_config, asic_name):
+    with open(os.devnull, 'w') as devnull:
+        saved, sys.stdout, sys.stderr = (sys.stdout, sys.stderr), devnull, devnull
+        try:
+            minigraph.parse_xml(graph, port_config_file=port_config, asic_name=asic_name)
+        finally:
+            sys.stdout, sys.stderr = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile qualified name construction in minigraph parsing")
+    parser.add_argument('graphs', nargs='*', help='minigraph files, default to the test graphs')
+    parser.add_argument('-n', '--runs', type=int, default=50, help='parses per graph')
+    parser.add_argument('-p', '--port-config')
+    parser.add_argument('--asic')
+    parser.add_argument('--engine-dir', default=ENGINE_DIR, help='sonic-config-engine directory to profile')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.realpath(args.engine_dir))
+    import minigraph
+    from lxml.etree import QName
+
+    unit_cost = timeit.timeit(lambda: str(QName(minigraph.ns, 'Hostname')), number=100000) / 100000
+
+    if args.graphs:
+        graphs = [(g, args.port_config, args.asic) for g in args.graphs]
+    else:
+        graphs = [(os.path.join(TESTS_DIR, g), p and os.path.join(TESTS_DIR, p), a) for g, p, a in DEFAULT_GRAPHS]
+
+    print('minigraph: {}'.format(os.path.realpath(minigraph.__file__)))
+    print('QName construction: {:.3f} us'.format(unit_cost * 1e6))
+    print('{:<40} {:>10} {:>12} {:>12} {:>10}'.format('graph', 'parse ms', 'first QNames', 'next QNames', 'share'))
+
+    CountingQName.qname = QName
+    minigraph.QName = CountingQName
+    try:
+        for graph, port_config, asic_name in graphs:
+            CountingQName.count = 0
+            parse(minigraph, graph, port_config, asic_name)
+            first = CountingQName.count
+
+            CountingQName.count = 0
+            parse(minigraph, graph, port_config, asic_name)
+            warm = CountingQName.count
+
+            minigraph.QName = QName
+            start = time.time()
+            for _ in range(args.runs):
+                parse(minigraph, graph, port_config, asic_name)
+            elapsed = (time.time() - start) / args.runs
+            minigraph.QName = CountingQName
+
+            print('{:<40} {:>10.2f} {:>12} {:>12} {:>9.1f}%'.format(
+                os.path.relpath(graph, TESTS_DIR), elapsed * 1000, first, warm,
+                100.0 * warm * unit_cost / elapsed))
+    finally:
+        minigraph.QName = QName
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Measure loading the port config files of the repository.
+
+Every device/**/port_config.ini file is loaded in three ways:
+    parse       parse_port_config_file(), a full parse of the file
+    cached      get_port_config() with the file rows memoized, which only
+                stats the file and builds the port dicts from the rows
+    alias       get_port_name_by_alias() for every alias of the file
+
+Usage:
+    benchmarks/port_config.py [-n RUNS] [port_config.ini ...]
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+REPO_DIR = os.path.realpath(os.path.join(ENGINE_DIR, '..', '..'))
+sys.path.insert(0, ENGINE_DIR)
+
+import portconfig
+
+
+def find_port_config_files():
+    port_config_files = []
+    for root, _, files in os.walk(os.path.join(REPO_DIR, 'device')):
+        port_config_files.extend(os.path.join(root, f) for f in files if f == 'port_config.ini')
+    return sorted(port_config_files)
+
+
+def run_parse(port_config_files):
+    for port_config_file in port_config_files:
+        portconfig.parse_port_config_file(port_config_file)
+
+
+def run_cached(port_config_files):
+    for port_config_file in port_config_files:
+        portconfig.get_port_config(port_config_file=port_config_file)
+
+
+def run_alias(port_config_files, aliases):
+    for port_config_file in port_config_files:
+        for alias in aliases[port_config_file]:
+            portconfig.get_port_name_by_alias(alias, port_config_file=port_config_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loading port config files")
+    parser.add_argument('port_config_files', nargs='*', help='port config files, default to all device port config files')
+    parser.add_argument('-n', '--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    port_config_files = [os.path.abspath(f) for f in args.port_config_files] or find_port_config_files()
+    aliases = dict((f, list(portconfig.load_port_config_file(f)[1])) for f in port_config_files)
+    lookups = sum(len(a) for a in aliases.values())
+
+    print('{} files, {} aliases, {} runs'.format(len(port_config_files), lookups, args.runs))
+    print('{:<8} {:>12} {:>14}'.format('', 'total ms', 'per item us'))
+    for name, func, items in [('parse', lambda: run_parse(port_config_files), len(port_config_files)),
+                              ('cached', lambda: run_cached(port_config_files), len(port_config_files)),
+                              ('alias', lambda: run_alias(port_config_files, aliases), lookups)]:
+        times = []
+        for _ in range(args.runs):
+            start = time.time()
+            func()
+            times.append(time.time() - start)
+        best = min(times)
+        print('{:<8} {:>12.2f} {:>14.1f}'.format(name, best * 1000, best * 1e6 / items))
+
+
+if __name__ == '__main__':
+    main()
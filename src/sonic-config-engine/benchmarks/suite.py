@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""Benchmark suite of the sonic-config-engine render pipeline.
+
+Times the boot critical paths of sonic-cfggen in one process:
+    parse/*         minigraph.parse_xml of the test graphs and of a synthetic
+                    large graph, with the parsed result cache disabled
+    render/*        'sonic-cfggen -d -y constants.yml -t template': CONFIG_DB
+                    read, sort_data and render of representative docker
+                    templates, for the t0 sample config and a synthetic
+                    config of PORTS ports
+    format/*        FormatConverter serialization of the large config, as
+                    for --print-data, and back
+    deep_update/*   merging the large config into the t0 config, as done
+                    for every input of sonic-cfggen
+
+CONFIG_DB is an in-memory backend, so no redis server is needed; see
+configdb_read.py for reads from a real redis. Results are printed as a
+table, and with --json written as machine readable JSON. --compare fails
+if a case got slower than --max-ratio times its time in a previous result.
+
+Usage:
+    benchmarks/suite.py [-n RUNS] [-k PATTERN] [--json FILE]
+                        [--compare FILE [--max-ratio RATIO]]
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import imp
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.realpath(__file__))
+ENGINE_DIR = os.path.join(BENCHMARKS_DIR, '..')
+REPO_DIR = os.path.realpath(os.path.join(ENGINE_DIR, '..', '..'))
+TESTS_DIR = os.path.join(ENGINE_DIR, 'tests')
+sys.path.insert(0, ENGINE_DIR)
+
+from minigraph_parse import DEFAULT_GRAPHS, make_large_graph
+from template_filters import CONSTANTS_FILE, FRR_DIR, build_config
+
+DOCKERS_DIR = os.path.join(REPO_DIR, 'dockers')
+
+# (template, extra template search paths)
+RENDER_TEMPLATES = [
+    (os.path.join(FRR_DIR, 'frr.conf.j2'), [FRR_DIR]),
+    (os.path.join(DOCKERS_DIR, 'docker-fpm-quagga', 'bgpd.conf.j2'), []),
+    (os.path.join(DOCKERS_DIR, 'docker-orchagent', 'ipinip.json.j2'), []),
+    (os.path.join(DOCKERS_DIR, 'docker-orchagent', 'ports.json.j2'), []),
+    (os.path.join(DOCKERS_DIR, 'docker-lldp-sv2', 'lldpd.conf.j2'), []),
+    (os.path.join(DOCKERS_DIR, 'docker-dhcp-relay', 'docker-dhcp-relay.supervisord.conf.j2'), []),
+    (os.path.join(DOCKERS_DIR, 'docker-snmp-sv2', 'snmpd.conf.j2'), []),
+]
+
+
+class MemoryConfigDB(object):
+    """ In-memory stand-in for ConfigDBConnector, holding a config in the
+        format of get_config(). Reads return copies, as reads from redis
+        return new objects every time. """
+
+    def __init__(self, config):
+        self.config = copy.deepcopy(config)
+
+    def get_table(self, table):
+        return copy.deepcopy(self.config.get(table, {}))
+
+    def get_config(self):
+        return copy.deepcopy(self.config)
+
+
+def quiet(func, *args, **kwargs):
+    """ Call func with stderr discarded, minigraph parsing warns a lot """
+    with open(os.devnull, 'w') as devnull:
+        stderr, sys.stderr = sys.stderr, devnull
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.stderr = stderr
+
+
+def measure(setup, run, runs):
+    """ Return the times of runs calls of run(*setup()), setup is not timed """
+    times = []
+    for _ in range(runs):
+        args = setup()
+        start = time.time()
+        run(*args)
+        times.append(time.time() - start)
+    return times
+
+
+def get_cases(cfggen, ports, tmp_dir):
+    """ Yield (name, setup, run) of every benchmark case """
+    for graph, port_config, asic_name in DEFAULT_GRAPHS:
+        graph = os.path.join(TESTS_DIR, graph)
+        port_config = port_config and os.path.join(TESTS_DIR, port_config)
+        yield ('parse/' + os.path.basename(graph) + (':' + asic_name if asic_name else ''), lambda: (),
+               lambda graph=graph, port_config=port_config, asic_name=asic_name:
+                   quiet(cfggen.minigraph.parse_xml, graph, port_config_file=port_config, asic_name=asic_name))
+    large_graph = os.path.join(tmp_dir, 'large-graph.xml')
+    make_large_graph(os.path.join(TESTS_DIR, 't1-sample-graph-mlnx.xml'), large_graph, 50)
+    yield ('parse/t1-sample-graph-mlnx.xml:x50', lambda: (), lambda: quiet(cfggen.minigraph.parse_xml, large_graph))
+
+    t0_data = quiet(cfggen.minigraph.parse_xml, os.path.join(TESTS_DIR, 't0-sample-graph.xml'),
+                    port_config_file=os.path.join(TESTS_DIR, 't0-sample-port-config.ini'))
+    large_data = dict((table, dict(value) if isinstance(value, dict) else value)
+                      for table, value in build_config(cfggen, ports).items())
+    constants = cfggen.load_yaml_file(CONSTANTS_FILE)
+
+    for config_name, data in [('t0', t0_data), ('{}ports'.format(ports), large_data)]:
+        configdb = MemoryConfigDB(cfggen.FormatConverter.output_to_db(data))
+        for template_file, paths in RENDER_TEMPLATES:
+            env = cfggen.get_jinja2_env(cfggen.get_template_paths([template_file]) + paths)
+            template = env.get_template(template_file)
+
+            def render(template=template, configdb=configdb):
+                cfggen.get_configdb = lambda namespace, db_kwargs, wait_for_init=True: configdb
+                # Each sonic-cfggen run starts with empty filter caches
+                cfggen._network_cache.clear()
+                cfggen._prefix_attr_cache.clear()
+                render_data = cfggen.FormatConverter.db_to_output(cfggen.read_configdb(None, {}))
+                cfggen.deep_update(render_data, copy.deepcopy(constants))
+                template.render(cfggen.sort_data(render_data))
+
+            yield ('render/{}:{}'.format(os.path.relpath(template_file, DOCKERS_DIR), config_name), lambda: (), render)
+
+    yield ('format/to_serialized', lambda: (copy.deepcopy(large_data),), cfggen.FormatConverter.to_serialized)
+    serialized = cfggen.FormatConverter.to_serialized(copy.deepcopy(large_data))
+    serialized = json.dumps(serialized, cls=cfggen.minigraph.minigraph_encoder)
+    yield ('format/to_deserialized', lambda: (json.loads(serialized),), cfggen.FormatConverter.to_deserialized)
+    yield ('format/output_to_db', lambda: (large_data,), cfggen.FormatConverter.output_to_db)
+    yield ('deep_update/{}ports'.format(ports), lambda: (copy.deepcopy(t0_data), copy.deepcopy(large_data)), cfggen.deep_update)
+
+
+def get_revision():
+    try:
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ENGINE_DIR, stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sonic-config-engine render pipeline")
+    parser.add_argument('-n', '--runs', type=int, default=10, help='runs per case, the median is reported')
+    parser.add_argument('-p', '--ports', type=int, default=512, help='ports of the synthetic large config')
+    parser.add_argument('-k', '--pattern', help='only run cases whose name matches this regular expression')
+    parser.add_argument('--json', help='write the results as JSON to this file, - for stdout')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    parser.add_argument('--max-ratio', type=float, default=1.5, help='fail if a case is slower than this times its previous time')
+    args = parser.parse_args()
+
+    cfggen = imp.load_source('sonic_cfggen', os.path.join(ENGINE_DIR, 'sonic-cfggen'))
+    # Measure the code, not the local caches of the host
+    cfggen.JINJA2_CACHE_DIR = os.devnull
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = dict((result['name'], result) for result in json.load(f)['results'])
+
+    out = sys.stderr if args.json == '-' else sys.stdout
+    results = []
+    regressions = []
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        print('{:<72} {:>10} {:>10} {:>8}'.format('case', 'median ms', 'min ms', 'ratio'), file=out)
+        for name, setup, run in get_cases(cfggen, args.ports, tmp_dir):
+            if args.pattern and not re.search(args.pattern, name):
+                continue
+            result = {'name': name}
+            try:
+                times = sorted(measure(setup, run, args.runs))
+            except Exception as e:
+                result['error'] = repr(e)
+                print('{:<72} {}'.format(name, result['error']), file=out)
+                results.append(result)
+                continue
+            result.update(median_ms=times[len(times) // 2] * 1000, min_ms=times[0] * 1000, runs=len(times))
+            ratio = ''
+            if 'median_ms' in previous.get(name, {}):
+                result['ratio'] = result['median_ms'] / previous[name]['median_ms']
+                ratio = '{:.2f}'.format(result['ratio'])
+                if result['ratio'] > args.max_ratio:
+                    regressions.append(name)
+            print('{:<72} {:>10.2f} {:>10.2f} {:>8}'.format(name, result['median_ms'], result['min_ms'], ratio), file=out)
+            results.append(result)
+    finally:
+        for name in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+
+    if args.json:
+        report = {
+            'revision': get_revision(),
+            'python': platform.python_version(),
+            'host': platform.node(),
+            'ports': args.ports,
+            'results': results,
+        }
+        if args.json == '-':
+            json.dump(report, sys.stdout, indent=4)
+        else:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=4)
+
+    if regressions:
+        print('Slower than {} times {}: {}'.format(args.max_ratio, args.compare, ', '.join(regressions)), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Measure the jinja2 bytecode cache of sonic-cfggen on the device templates.
+
+Every device/**/*.j2 template of the repository is loaded and rendered with
+the config of the t0 sample minigraph, through the jinja2 environment of
+sonic-cfggen, in three passes:
+    none    no usable bytecode cache (redis is not reachable)
+    cold    empty local disk cache, bytecode is compiled and stored
+    warm    bytecode is loaded from the local disk cache
+Each pass uses a new environment, as each sonic-cfggen run does. Templates
+which do not render with the sample data are still loaded and counted.
+
+Usage:
+    benchmarks/template_cache.py [-n RUNS] [template.j2 ...]
+"""
+
+from __future__ import print_function
+
+import argparse
+import imp
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+REPO_DIR = os.path.realpath(os.path.join(ENGINE_DIR, '..', '..'))
+TESTS_DIR = os.path.join(ENGINE_DIR, 'tests')
+sys.path.insert(0, ENGINE_DIR)
+
+
+def find_templates():
+    templates = []
+    for root, _, files in os.walk(os.path.join(REPO_DIR, 'device')):
+        templates.extend(os.path.join(root, f) for f in files if f.endswith('.j2'))
+    return sorted(templates)
+
+
+def run_pass(cfggen, templates, data):
+    load_time = 0
+    render_time = 0
+    failed = 0
+    env = cfggen.get_jinja2_env(cfggen.get_template_paths(templates) + [os.path.join(REPO_DIR, 'files', 'build_templates')])
+    for template_file in templates:
+        start = time.time()
+        template = env.get_template(template_file)
+        load_time += time.time() - start
+        start = time.time()
+        try:
+            template.render(data)
+        except Exception:
+            failed += 1
+        render_time += time.time() - start
+    return load_time, render_time, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the jinja2 bytecode cache on the device templates")
+    parser.add_argument('templates', nargs='*', help='templates, default to all device templates')
+    parser.add_argument('-n', '--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    templates = [os.path.abspath(t) for t in args.templates] or find_templates()
+    cfggen = imp.load_source('sonic_cfggen', os.path.join(ENGINE_DIR, 'sonic-cfggen'))
+    with open(os.devnull, 'w') as devnull:
+        stderr, sys.stderr = sys.stderr, devnull
+        try:
+            data = cfggen.minigraph.parse_xml(os.path.join(TESTS_DIR, 't0-sample-graph.xml'),
+                                              port_config_file=os.path.join(TESTS_DIR, 't0-sample-port-config.ini'))
+        finally:
+            sys.stderr = stderr
+    data = cfggen.sort_data(data)
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        print('{} templates, {} runs'.format(len(templates), args.runs))
+        print('{:<8} {:>12} {:>12} {:>8}'.format('pass', 'load ms', 'render ms', 'failed'))
+        for name in ['none', 'cold', 'warm']:
+            results = []
+            for _ in range(args.runs):
+                if name == 'none':
+                    cfggen.JINJA2_CACHE_DIR = os.path.join(cache_dir, 'disabled')
+                else:
+                    cfggen.JINJA2_CACHE_DIR = cache_dir
+                    if name == 'cold':
+                        shutil.rmtree(cache_dir)
+                        os.mkdir(cache_dir)
+                results.append(run_pass(cfggen, templates, data))
+            load_time, render_time, failed = min(results)
+            print('{:<8} {:>12.1f} {:>12.1f} {:>8}'.format(name, load_time * 1000, render_time * 1000, failed))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Measure rendering of the filter heavy templates on a large device.
+
+The config of the t0 sample minigraph is extended to PORTS ports, each with
+an IPv4 and an IPv6 interface, a BGP neighbor per address and a device
+neighbor. The templates which loop over ports, interfaces and neighbors,
+applying the ipv4/ipv6/pfx_filter/ip/network/prefixlen filters, are then
+rendered through the jinja2 environment of sonic-cfggen. The filter caches
+are emptied before each render, as in a new sonic-cfggen run.
+
+Usage:
+    benchmarks/template_filters.py [-n RUNS] [-p PORTS]
+"""
+
+from __future__ import print_function
+
+import argparse
+import imp
+import os
+import sys
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+REPO_DIR = os.path.realpath(os.path.join(ENGINE_DIR, '..', '..'))
+TESTS_DIR = os.path.join(ENGINE_DIR, 'tests')
+sys.path.insert(0, ENGINE_DIR)
+
+DELL_DIR = os.path.join(REPO_DIR, 'device', 'dell', 'x86_64-dell_s6100_c2538-r0', 'Force10-S6100')
+BUILD_TEMPLATES_DIR = os.path.join(REPO_DIR, 'files', 'build_templates')
+FRR_DIR = os.path.join(REPO_DIR, 'dockers', 'docker-fpm-frr', 'frr')
+CONSTANTS_FILE = os.path.join(REPO_DIR, 'files', 'image_config', 'constants', 'constants.yml')
+
+# (template, extra template search paths)
+TEMPLATES = [
+    (os.path.join(FRR_DIR, 'frr.conf.j2'), [FRR_DIR]),
+    (os.path.join(REPO_DIR, 'dockers', 'docker-fpm-quagga', 'bgpd.conf.j2'), []),
+    (os.path.join(REPO_DIR, 'dockers', 'docker-fpm-quagga', 'zebra.conf.j2'), []),
+    (os.path.join(FRR_DIR, 'zebra', 'zebra.interfaces.conf.j2'), [FRR_DIR]),
+    (os.path.join(REPO_DIR, 'dockers', 'docker-orchagent', 'ipinip.json.j2'), []),
+    (os.path.join(DELL_DIR, 'qos.json.j2'), [BUILD_TEMPLATES_DIR]),
+    (os.path.join(DELL_DIR, 'buffers.json.j2'), [BUILD_TEMPLATES_DIR]),
+]
+
+
+def build_config(cfggen, ports):
+    with open(os.devnull, 'w') as devnull:
+        stderr, sys.stderr = sys.stderr, devnull
+        try:
+            data = cfggen.minigraph.parse_xml(os.path.join(TESTS_DIR, 't0-sample-graph.xml'),
+                                              port_config_file=os.path.join(TESTS_DIR, 't0-sample-port-config.ini'))
+        finally:
+            sys.stderr = stderr
+    for table in ['PORT', 'INTERFACE', 'BGP_NEIGHBOR', 'DEVICE_NEIGHBOR', 'DEVICE_NEIGHBOR_METADATA']:
+        data[table] = {}
+    for i in range(ports):
+        name = 'Ethernet{}'.format(i * 4)
+        neighbor = 'ARISTA{:03d}T1'.format(i)
+        ipv4 = '10.{}.{}.{}'.format(i // 128, (i // 2) % 256, (i % 128) * 2)
+        ipv6 = 'fc00::{:x}'.format(i * 4 + 1)
+        data['PORT'][name] = {'lanes': ','.join(str(i * 4 + l) for l in range(4)), 'alias': 'etp{}'.format(i + 1),
+                              'speed': '100000', 'mtu': '9100', 'admin_status': 'up', 'description': neighbor}
+        data['INTERFACE'][name] = {}
+        data['INTERFACE'][(name, ipv4 + '/31')] = {}
+        data['INTERFACE'][(name, ipv6 + '/126')] = {}
+        data['DEVICE_NEIGHBOR'][name] = {'name': neighbor, 'port': 'Ethernet1'}
+        data['DEVICE_NEIGHBOR_METADATA'][neighbor] = {'type': 'LeafRouter', 'hwsku': 'Arista-VM', 'mgmt_addr': '10.64.247.{}'.format(i % 256)}
+        data['BGP_NEIGHBOR'][ipv4[:-1] + str(int(ipv4.split('.')[-1]) + 1)] = {'name': neighbor, 'asn': '64600', 'local_addr': ipv4}
+        data['BGP_NEIGHBOR']['fc00::{:x}'.format(i * 4 + 2)] = {'name': neighbor, 'asn': '64600', 'local_addr': ipv6}
+    cfggen.deep_update(data, cfggen.load_yaml_file(CONSTANTS_FILE))
+    return cfggen.sort_data(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rendering filter heavy templates on many ports")
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('-p', '--ports', type=int, default=512)
+    args = parser.parse_args()
+
+    cfggen = imp.load_source('sonic_cfggen', os.path.join(ENGINE_DIR, 'sonic-cfggen'))
+    data = build_config(cfggen, args.ports)
+
+    print('{} ports, {} runs'.format(args.ports, args.runs))
+    print('{:<72} {:>10}'.format('template', 'render ms'))
+    total = 0
+    for template_file, paths in TEMPLATES:
+        env = cfggen.get_jinja2_env(cfggen.get_template_paths([template_file]) + paths)
+        template = env.get_template(template_file)
+        times = []
+        for _ in range(args.runs):
+            # Each sonic-cfggen run renders with empty filter caches
+            cfggen._network_cache.clear()
+            cfggen._prefix_attr_cache.clear()
+            start = time.time()
+            try:
+                template.render(data)
+            except Exception as e:
+                times = None
+                print('{:<72} {:>10}'.format(os.path.relpath(template_file, REPO_DIR), 'failed: {}'.format(e)))
+                break
+            times.append(time.time() - start)
+        if times:
+            total += min(times)
+            print('{:<72} {:>10.1f}'.format(os.path.relpath(template_file, REPO_DIR), min(times) * 1000))
+    print('{:<72} {:>10.1f}'.format('total', total * 1000))
+
+
+if __name__ == '__main__':
+    main()
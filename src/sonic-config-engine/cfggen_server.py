@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""cfggen_server
+
+Unix socket transport used to run sonic-cfggen as a long-lived render server.
+
+A warm sonic-cfggen process (started with 'sonic-cfggen --server') keeps all
+heavy modules imported, keeps its DB connections and jinja2 environments alive,
+and answers requests carrying the usual sonic-cfggen command line arguments.
+The sonic-cfggen-client script forwards its own arguments, directory and
+environment to the server and reproduces the server's stdout, stderr and exit
+code, so boot scripts keep their current syntax.
+
+This module is imported by the client, so it must only depend on the
+standard library modules which are cheap to import.
+"""
+
+import errno
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+from StringIO import StringIO
+
+DEFAULT_SOCKET_PATH = '/var/run/sonic-cfggen/cfggen.sock'
+SOCKET_PATH_ENV = 'SONIC_CFGGEN_SOCK'
+RECV_BUFFER_SIZE = 65536
+
+
+def get_socket_path(path=None):
+    if path:
+        return path
+    return os.environ.get(SOCKET_PATH_ENV, DEFAULT_SOCKET_PATH)
+
+
+def _recv_all(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(RECV_BUFFER_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return ''.join(chunks)
+
+
+def _to_bytes(value):
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return value
+
+
+def _set_environ(env):
+    os.environ.clear()
+    os.environ.update(env)
+
+
+def run_captured(func, *args, **kwargs):
+    """ Call func(*args) with its stdout and stderr captured, in directory
+        cwd and with environment env if given. Returns the reply dict of a
+        request, with the exit code that func would have given to the process.
+    """
+    cwd = kwargs.get('cwd')
+    env = kwargs.get('env')
+    start = time.time()
+    saved = (sys.stdout, sys.stderr, os.getcwd(), dict(os.environ))
+    out, err = StringIO(), StringIO()
+    rc = 0
+    sys.stdout, sys.stderr = out, err
+    try:
+        if cwd:
+            os.chdir(cwd)
+        if env is not None:
+            _set_environ(env)
+        func(*args)
+    except SystemExit as e:
+        if e.code is None:
+            rc = 0
+        elif isinstance(e.code, int):
+            rc = e.code
+        else:
+            print >> err, e.code
+            rc = 1
+    except Exception:
+        traceback.print_exc(file=err)
+        rc = 1
+    finally:
+        sys.stdout, sys.stderr = saved[0], saved[1]
+        os.chdir(saved[2])
+        if env is not None:
+            _set_environ(saved[3])
+    return {
+        'rc': rc,
+        'stdout': _to_bytes(out.getvalue()),
+        'stderr': _to_bytes(err.getvalue()),
+        'elapsed': time.time() - start,
+    }
+
+
+class CfgGenServer(object):
+    """ Serve sonic-cfggen requests on a unix socket, one at a time.
+        handler is called with the argument list of every request and
+        prints its result to stdout/stderr, exactly like the main() of
+        sonic-cfggen does. """
+
+    def __init__(self, handler, socket_path=None):
+        self.handler = handler
+        self.socket_path = get_socket_path(socket_path)
+        self.sock = None
+
+    def bind(self):
+        sock_dir = os.path.dirname(self.socket_path)
+        if sock_dir and not os.path.isdir(sock_dir):
+            os.makedirs(sock_dir)
+        try:
+            os.unlink(self.socket_path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.socket_path)
+        self.sock.listen(16)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+    def run_request(self, request):
+        """ Run a single request and return the reply dict """
+        return run_captured(self.handler, request.get('argv', []), cwd=request.get('cwd'), env=request.get('env'))
+
+    def serve_forever(self):
+        self.bind()
+        try:
+            while True:
+                conn, _ = self.sock.accept()
+                try:
+                    request = json.loads(_recv_all(conn))
+                    reply = self.run_request(request)
+                    conn.sendall(json.dumps(reply))
+                except (socket.error, ValueError) as e:
+                    print >> sys.stderr, 'cfggen server: dropped request: {}'.format(e)
+                finally:
+                    conn.close()
+        finally:
+            self.close()
+
+
+def connect(socket_path=None, timeout=None):
+    """ Return a socket connected to a running server.
+        Raises socket.error if no server is listening on the socket. """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if timeout is not None:
+        sock.settimeout(timeout)
+    try:
+        sock.connect(get_socket_path(socket_path))
+    except socket.error:
+        sock.close()
+        raise
+    return sock
+
+
+def send_request(sock, argv, cwd=None, env=None):
+    """ Send a request on a socket returned by connect() and return the reply
+        dict. The request runs in directory cwd and with environment env,
+        the ones of this process by default. The socket is closed. """
+    try:
+        sock.sendall(json.dumps({
+            'argv': argv,
+            'cwd': cwd or os.getcwd(),
+            'env': dict(os.environ) if env is None else env,
+        }))
+        sock.shutdown(socket.SHUT_WR)
+        reply = json.loads(_recv_all(sock))
+    finally:
+        sock.close()
+    return reply
+
+
+def request(argv, socket_path=None, cwd=None, env=None, timeout=None):
+    """ Send a request to a running server and return the reply dict.
+        Raises socket.error if no server is listening on the socket, or if
+        the server fails before replying. """
+    return send_request(connect(socket_path, timeout), argv, cwd, env)
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 import os
 import sys
-from natsort import natsorted
+from lazy_import import lazy_import
+
+natsort = lazy_import('natsort')
 
 def generate_t1_sample_config(data):
     data['DEVICE_METADATA']['localhost']['hostname'] = 'sonic'
@@ -13,7 +15,7 @@ def generate_t1_sample_config(data):
     data['INTERFACE'] = {}
     port_count = 0
     total_port_amount = len(data['PORT'])
-    for port in natsorted(data['PORT'].keys()):
+    for port in natsort.natsorted(data['PORT'].keys()):
         data['PORT'][port]['admin_status'] = 'up'
         data['PORT'][port]['mtu'] = '9100'
         local_addr = '10.0.{}.{}'.format(2 * port_count / 256, 2 * port_count % 256)
@@ -47,10 +49,10 @@ def generate_l2_config(data):
     if not data['DEVICE_METADATA']['localhost'].has_key('type'):
         data['DEVICE_METADATA']['localhost']['type'] = 'ToRRouter'
     data['VLAN'] = {'Vlan1000': {'vlanid': '1000'}}
-    vp = natsorted(data['PORT'].keys())
+    vp = natsort.natsorted(data['PORT'].keys())
     data['VLAN']['Vlan1000'].setdefault('members', vp)
     data['VLAN_MEMBER'] = {}
-    for port in natsorted(data['PORT'].keys()):
+    for port in natsort.natsorted(data['PORT'].keys()):
         data['PORT'][port].setdefault('admin_status', 'up')
         data['VLAN_MEMBER']['Vlan1000|{}'.format(port)] = {'tagging_mode': 'untagged'}
     return data
@@ -0,0 +1,90 @@
+"""configdb_diff
+
+Incremental write of sonic-cfggen data into CONFIG_DB.
+
+ConfigDBConnector.mod_config() runs one HMSET per entry it is given, even
+if the entry already holds the same values, and each of them wakes up the
+daemons subscribed to the table. write_config_diff() leaves CONFIG_DB in the
+same state as mod_config(), but it first reads the entries it is about to
+write, then only sets the fields whose value differs and only deletes the
+entries which exist. Reads and writes are pipelined in batches.
+"""
+
+DEFAULT_BATCH_SIZE = 512
+
+
+def _batches(items, batch_size):
+    for i in range(0, len(items), batch_size):
+        yield items[i:i + batch_size]
+
+
+def _get_hash(configdb, table, key):
+    return '{}{}{}'.format(table.upper(), configdb.TABLE_NAME_SEPARATOR, configdb.serialize_key(key))
+
+
+def _read_entries(client, hashes, batch_size):
+    current = {}
+    for batch in _batches(hashes, batch_size):
+        pipe = client.pipeline(transaction=False)
+        for _hash in batch:
+            pipe.hgetall(_hash)
+        current.update(zip(batch, pipe.execute()))
+    return current
+
+
+def diff_config(configdb, data, batch_size=DEFAULT_BATCH_SIZE):
+    """ Compare data, in the format taken by configdb.mod_config(), with the
+        content of CONFIG_DB.
+
+    Returns a tuple (updates, deletes, unchanged):
+    updates -- {redis key: {field: value}} of the fields to set
+    deletes -- list of the redis keys to delete
+    unchanged -- number of entries which need no write
+    """
+    client = configdb.get_redis_client(configdb.db_name)
+    wanted = {}
+    deletes = []
+    for table, table_data in data.iteritems():
+        if table_data is None:
+            deletes.extend(client.keys('{}{}*'.format(table.upper(), configdb.TABLE_NAME_SEPARATOR)))
+            continue
+        for key, entry in table_data.iteritems():
+            wanted[_get_hash(configdb, table, key)] = configdb.typed_to_raw(entry)
+
+    current = _read_entries(client, sorted(wanted), batch_size)
+    updates = {}
+    unchanged = 0
+    for _hash, raw in wanted.iteritems():
+        if raw is None:
+            if current[_hash]:
+                deletes.append(_hash)
+            else:
+                unchanged += 1
+            continue
+        fields = dict((f, v) for f, v in raw.iteritems() if current[_hash].get(f) != v)
+        if fields:
+            updates[_hash] = fields
+        else:
+            unchanged += 1
+    return updates, sorted(set(deletes)), unchanged
+
+
+def write_config_diff(configdb, data, batch_size=DEFAULT_BATCH_SIZE):
+    """ Same as configdb.mod_config(data), writing only what differs from
+        the current content of CONFIG_DB.
+
+    Returns a tuple (changed, deleted, unchanged) of entry counts.
+    """
+    updates, deletes, unchanged = diff_config(configdb, data, batch_size)
+    client = configdb.get_redis_client(configdb.db_name)
+    commands = [('hmset', _hash, fields) for _hash, fields in sorted(updates.iteritems())]
+    commands += [('delete', _hash, None) for _hash in deletes]
+    for batch in _batches(commands, batch_size):
+        pipe = client.pipeline(transaction=False)
+        for command, _hash, fields in batch:
+            if command == 'delete':
+                pipe.delete(_hash)
+            else:
+                pipe.hmset(_hash, fields)
+        pipe.execute()
+    return len(updates), len(deletes), unchanged
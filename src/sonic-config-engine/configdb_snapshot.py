@@ -0,0 +1,122 @@
+"""configdb_snapshot
+
+Local copy of CONFIG_DB for long-lived sonic-cfggen processes.
+
+Reading the whole CONFIG_DB with ConfigDBConnector.get_config() costs a KEYS
+and one HGETALL per entry. A ConfigDBSnapshot keeps the result of the last
+full read and subscribes to the keyspace notifications of CONFIG_DB before
+that read. Every notification received moves the generation counter of the
+snapshot, and the database is only read again when the generation moved
+since the snapshot was taken. If keyspace notifications are not enabled on
+the redis server, or the subscription breaks, every call reads the database.
+
+A notification may still be on its way when the snapshot is used. So before
+each use, a barrier message is published on a channel of the subscription:
+redis queues it after the notifications of every change it has already
+made, and the notifications are read until the barrier arrives. A change
+made before the call is then always seen. If the barrier does not arrive in
+BARRIER_TIMEOUT seconds, the database is read.
+"""
+
+import copy
+import os
+import time
+
+from lazy_import import lazy_import
+
+# Only used through swsssdk connections, which require it. It is imported
+# on first use like the other heavy modules of sonic-cfggen.
+redis = lazy_import('redis')
+
+# Keyspace notification classes which cover every change of a CONFIG_DB
+# entry: 'K' keyspace events, 'h' hash and 'g' generic (del, rename, ...)
+# commands. 'A' is an alias including both 'h' and 'g'.
+REQUIRED_EVENT_CLASSES = [('K',), ('A', 'h'), ('A', 'g')]
+
+BARRIER_CHANNEL = 'sonic-cfggen-snapshot:{}:{}'
+BARRIER_TIMEOUT = 1.0
+
+
+def notifications_enabled(client):
+    try:
+        events = client.config_get('notify-keyspace-events').get('notify-keyspace-events', '')
+    except redis.exceptions.ResponseError:
+        # CONFIG may be disabled on the server
+        return False
+    return all(any(c in events for c in classes) for classes in REQUIRED_EVENT_CLASSES)
+
+
+def get_tables(configdb, tables):
+    """ Read only the given tables, in the format of ConfigDBConnector.get_config() """
+    data = {}
+    for table in tables:
+        entries = configdb.get_table(table)
+        if entries:
+            data[table] = entries
+    return data
+
+
+class ConfigDBSnapshot(object):
+    """ Cached result of configdb.get_config(), dropped whenever CONFIG_DB changes """
+
+    def __init__(self, configdb):
+        self.configdb = configdb
+        self.client = None
+        self.pubsub = None
+        self.channel = BARRIER_CHANNEL.format(os.getpid(), id(self))
+        self.barrier = 0
+        self.generation = 0
+        self.config = None
+        self.config_generation = None
+
+    def subscribe(self):
+        self.client = self.configdb.get_redis_client(self.configdb.db_name)
+        if not notifications_enabled(self.client):
+            return False
+        self.pubsub = self.client.pubsub()
+        self.pubsub.psubscribe('__keyspace@{}__:*'.format(self.configdb.get_dbid(self.configdb.db_name)))
+        self.pubsub.subscribe(self.channel)
+        return True
+
+    def close(self):
+        if self.pubsub is not None:
+            self.pubsub.close()
+            self.pubsub = None
+        self.config = None
+
+    def update_generation(self):
+        """ Count the notifications of the changes made since the last call,
+            up to a barrier published now. Returns False if changes cannot be
+            tracked. """
+        try:
+            if self.pubsub is None and not self.subscribe():
+                return False
+            self.barrier += 1
+            barrier = str(self.barrier)
+            self.client.publish(self.channel, barrier)
+            deadline = time.time() + BARRIER_TIMEOUT
+            while True:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    self.close()
+                    return False
+                message = self.pubsub.get_message(timeout=timeout)
+                if message is None:
+                    continue
+                if message['type'] == 'pmessage':
+                    self.generation += 1
+                elif message['type'] == 'message' and message['data'] == barrier:
+                    return True
+        except redis.exceptions.RedisError:
+            self.close()
+            return False
+
+    def get_config(self):
+        """ Same as configdb.get_config(), served from the snapshot while
+            the generation did not move. The caller may modify the result. """
+        if not self.update_generation():
+            return self.configdb.get_config()
+        if self.config is None or self.config_generation != self.generation:
+            self.config_generation = self.generation
+            self.config = self.configdb.get_config()
+        return copy.deepcopy(self.config)
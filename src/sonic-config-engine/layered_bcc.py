@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+import jinja2
+
+class FileBytecodeCache(jinja2.BytecodeCache):
+    """ A bytecode cache for jinja2 template that stores bytecode in files
+        of a local directory, one file per template. Files are replaced
+        atomically, so that concurrent renders never load a partial entry.
+        Stale entries are detected by jinja2 with the source checksum
+        stored in them. """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _get_cache_filename(self, bucket):
+        return os.path.join(self.directory, 'jinja2-{}-{}.cache'.format(jinja2.__version__, bucket.key))
+
+    def load_bytecode(self, bucket):
+        try:
+            with open(self._get_cache_filename(bucket), 'rb') as f:
+                bucket.load_bytecode(f)
+        except Exception:
+            bucket.reset()
+
+    def dump_bytecode(self, bucket):
+        try:
+            (fd, tmp_file) = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                bucket.write_bytecode(f)
+            os.rename(tmp_file, self._get_cache_filename(bucket))
+        except Exception:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
+class LayeredBytecodeCache(jinja2.BytecodeCache):
+    """ A bytecode cache for jinja2 template that looks up bytecode in a
+        list of caches, fastest first. Bytecode found in a cache is copied
+        to the caches before it, new bytecode is stored in all of them.
+
+        A cache may be given as a function returning it, which is only
+        called once a template is not found in the caches before it. """
+
+    def __init__(self, caches):
+        self._caches = list(caches)
+
+    def _get_cache(self, index):
+        cache = self._caches[index]
+        if not isinstance(cache, jinja2.BytecodeCache):
+            cache = self._caches[index] = cache()
+        return cache
+
+    def load_bytecode(self, bucket):
+        for index in range(len(self._caches)):
+            self._get_cache(index).load_bytecode(bucket)
+            if bucket.code is not None:
+                for upper in range(index):
+                    self._get_cache(upper).dump_bytecode(bucket)
+                return
+
+    def dump_bytecode(self, bucket):
+        for index in range(len(self._caches)):
+            self._get_cache(index).dump_bytecode(bucket)
@@ -0,0 +1,26 @@
+# Deferred module imports, to improve start up time of sonic-cfggen
+#
+# 'jinja2 = lazy_import("jinja2")' binds a placeholder module which imports
+# jinja2 on first attribute access, so that sonic-cfggen invocations which
+# do not render templates, parse minigraph or connect to the DB do not pay
+# for importing the modules they would need to.
+
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super(LazyModule, self).__init__(name)
+
+    def __getattr__(self, name):
+        # Only called for attributes not found in the placeholder. Once
+        # imported, the module content is copied to the placeholder, so
+        # that next lookups are as fast as on the module itself.
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, name)
+
+
+def lazy_import(name):
+    return LazyModule(name)
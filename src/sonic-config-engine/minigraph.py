@@ -7,13 +7,19 @@ import socket
 import struct
 import json
 import copy
+import hashlib
+import tempfile
+import cPickle as pickle
 import ipaddr as ipaddress
 from collections import defaultdict
+from collections import OrderedDict
+from StringIO import StringIO
 
 from lxml import etree as ET
 from lxml.etree import QName
 
 from portconfig import get_port_config
+from portconfig import get_port_config_file_name
 from sonic_device_util import get_npu_id_from_name
 
 """minigraph.py
@@ -27,6 +33,27 @@ ns1 = "http://schemas.datacontract.org/2004/07/Microsoft.Search.Autopilot.Evolut
 ns2 = "Microsoft.Search.Autopilot.NetMux"
 ns3 = "http://www.w3.org/2001/XMLSchema-instance"
 
+class QNameTable(object):
+    """ Qualified tag names of one namespace, in the '{namespace}tag' form
+        used by lxml, e.g. qn.Hostname. Each name is built on first use and
+        then kept as an attribute, so lookups in the parsing loops are plain
+        attribute reads.
+    """
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def __getattr__(self, tag):
+        if tag.startswith('__'):
+            raise AttributeError(tag)
+        qname = str(QName(self.namespace, tag))
+        setattr(self, tag, qname)
+        return qname
+
+qn = QNameTable(ns)
+qn1 = QNameTable(ns1)
+qn2 = QNameTable(ns2)
+qn3 = QNameTable(ns3)
+
 # Device types
 spine_chassis_frontend_role = 'SpineChassisFrontendRouter'
 chassis_backend_role = 'ChassisBackendRouter'
@@ -39,9 +66,19 @@ FRONTEND_ASIC_SUB_ROLE = 'FrontEnd'
 BACKEND_ASIC_SUB_ROLE = 'BackEnd'
 BACKEND_ASIC_INTERFACE_NAME_PREFIX = 'Ethernet-BP'
 
+# Default location of parsed minigraph results, see parse_xml
+MINIGRAPH_CACHE_DIR = '/var/cache/sonic/minigraph'
+MINIGRAPH_CACHE_MAX_ENTRIES = 16
+
 # Default Virtual Network Index (VNI) 
 vni_default = 8000
 
+# Top level elements of a minigraph file
+minigraph_section_tags = [getattr(qn, tag) for tag in [
+    "HwSku", "Hostname", "DockerRoutingConfigMode",
+    "CpgDec", "DpgDec", "PngDec", "UngDec",
+    "MetadataDeclaration", "LinkMetadataDeclaration", "DeviceInfos"]]
+
 ###############################################################################
 #
 # Minigraph parsing functions
@@ -64,19 +101,19 @@ def parse_device(device):
     hwsku = None
     name = None
     deployment_id = None
-    if str(QName(ns3, "type")) in device.attrib:
-        d_type = device.attrib[str(QName(ns3, "type"))]
+    if qn3.type in device.attrib:
+        d_type = device.attrib[qn3.type]
 
     for node in device:
-        if node.tag == str(QName(ns, "Address")):
-            lo_prefix = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "ManagementAddress")):
-            mgmt_prefix = node.find(str(QName(ns2, "IPPrefix"))).text
-        elif node.tag == str(QName(ns, "Hostname")):
+        if node.tag == qn.Address:
+            lo_prefix = node.find(qn2.IPPrefix).text
+        elif node.tag == qn.ManagementAddress:
+            mgmt_prefix = node.find(qn2.IPPrefix).text
+        elif node.tag == qn.Hostname:
             name = node.text
-        elif node.tag == str(QName(ns, "HwSku")):
+        elif node.tag == qn.HwSku:
             hwsku = node.text
-        elif node.tag == str(QName(ns, "DeploymentId")):
+        elif node.tag == qn.DeploymentId:
             deployment_id = node.text
     return (lo_prefix, mgmt_prefix, name, hwsku, d_type, deployment_id)
 
@@ -90,16 +127,16 @@ def parse_png(png, hname):
     port_speeds = {}
     console_ports = {}
     for child in png:
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, "DeviceLinkBase"))):
-                linktype = link.find(str(QName(ns, "ElementType"))).text
+        if child.tag == qn.DeviceInterfaceLinks:
+            for link in child.findall(qn.DeviceLinkBase):
+                linktype = link.find(qn.ElementType).text
                 if linktype == "DeviceSerialLink":
-                    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-                    endport = link.find(str(QName(ns, "EndPort"))).text
-                    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-                    startport = link.find(str(QName(ns, "StartPort"))).text
-                    baudrate = link.find(str(QName(ns, "Bandwidth"))).text
-                    flowcontrol = 1 if link.find(str(QName(ns, "FlowControl"))) is not None and link.find(str(QName(ns, "FlowControl"))).text == 'true' else 0
+                    enddevice = link.find(qn.EndDevice).text
+                    endport = link.find(qn.EndPort).text
+                    startdevice = link.find(qn.StartDevice).text
+                    startport = link.find(qn.StartPort).text
+                    baudrate = link.find(qn.Bandwidth).text
+                    flowcontrol = 1 if link.find(qn.FlowControl) is not None and link.find(qn.FlowControl).text == 'true' else 0
                     if enddevice.lower() == hname.lower():
                         console_ports[endport] = {
                             'remote_device': startdevice,
@@ -117,11 +154,11 @@ def parse_png(png, hname):
                 if linktype != "DeviceInterfaceLink" and linktype != "UnderlayInterfaceLink":
                     continue
 
-                enddevice = link.find(str(QName(ns, "EndDevice"))).text
-                endport = link.find(str(QName(ns, "EndPort"))).text
-                startdevice = link.find(str(QName(ns, "StartDevice"))).text
-                startport = link.find(str(QName(ns, "StartPort"))).text
-                bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
+                enddevice = link.find(qn.EndDevice).text
+                endport = link.find(qn.EndPort).text
+                startdevice = link.find(qn.StartDevice).text
+                startport = link.find(qn.StartPort).text
+                bandwidth_node = link.find(qn.Bandwidth)
                 bandwidth = bandwidth_node.text if bandwidth_node is not None else None
                 if enddevice.lower() == hname.lower():
                     if port_alias_map.has_key(endport):
@@ -136,29 +173,29 @@ def parse_png(png, hname):
                     if bandwidth:
                         port_speeds[startport] = bandwidth
 
-        if child.tag == str(QName(ns, "Devices")):
-            for device in child.findall(str(QName(ns, "Device"))):
+        if child.tag == qn.Devices:
+            for device in child.findall(qn.Device):
                 (lo_prefix, mgmt_prefix, name, hwsku, d_type, deployment_id) = parse_device(device)
                 device_data = {'lo_addr': lo_prefix, 'type': d_type, 'mgmt_addr': mgmt_prefix, 'hwsku': hwsku }
                 if deployment_id:
                     device_data['deployment_id'] = deployment_id
                 devices[name] = device_data
 
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for if_link in child.findall(str(QName(ns, 'DeviceLinkBase'))):
-                if str(QName(ns3, "type")) in if_link.attrib:
-                    link_type = if_link.attrib[str(QName(ns3, "type"))]
+        if child.tag == qn.DeviceInterfaceLinks:
+            for if_link in child.findall(qn.DeviceLinkBase):
+                if qn3.type in if_link.attrib:
+                    link_type = if_link.attrib[qn3.type]
                     if link_type == 'DeviceSerialLink':
                         for node in if_link:
-                            if node.tag == str(QName(ns, "EndPort")):
+                            if node.tag == qn.EndPort:
                                 console_port = node.text.split()[-1]
-                            elif node.tag == str(QName(ns, "EndDevice")):
+                            elif node.tag == qn.EndDevice:
                                 console_dev = node.text
                     elif link_type == 'DeviceMgmtLink':
                         for node in if_link:
-                            if node.tag == str(QName(ns, "EndPort")):
+                            if node.tag == qn.EndPort:
                                 mgmt_port = node.text.split()[-1]
-                            elif node.tag == str(QName(ns, "EndDevice")):
+                            elif node.tag == qn.EndDevice:
                                 mgmt_dev = node.text
 
     return (neighbors, devices, console_dev, console_port, mgmt_dev, mgmt_port, port_speeds, console_ports)
@@ -166,11 +203,11 @@ def parse_png(png, hname):
 def parse_asic_external_link(link, asic_name, hostname):
     neighbors = {}
     port_speeds = {}
-    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-    endport = link.find(str(QName(ns, "EndPort"))).text
-    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-    startport = link.find(str(QName(ns, "StartPort"))).text
-    bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
+    enddevice = link.find(qn.EndDevice).text
+    endport = link.find(qn.EndPort).text
+    startdevice = link.find(qn.StartDevice).text
+    startport = link.find(qn.StartPort).text
+    bandwidth_node = link.find(qn.Bandwidth)
     bandwidth = bandwidth_node.text if bandwidth_node is not None else None
     # if chassis internal is false, the interface name will be
     # interface alias which should be converted to asic port name
@@ -194,11 +231,11 @@ def parse_asic_external_link(link, asic_name, hostname):
 def parse_asic_internal_link(link, asic_name, hostname):
     neighbors = {}
     port_speeds = {}
-    enddevice = link.find(str(QName(ns, "EndDevice"))).text
-    endport = link.find(str(QName(ns, "EndPort"))).text
-    startdevice = link.find(str(QName(ns, "StartDevice"))).text
-    startport = link.find(str(QName(ns, "StartPort"))).text
-    bandwidth_node = link.find(str(QName(ns, "Bandwidth")))
+    enddevice = link.find(qn.EndDevice).text
+    endport = link.find(qn.EndPort).text
+    startdevice = link.find(qn.StartDevice).text
+    startport = link.find(qn.StartPort).text
+    bandwidth_node = link.find(qn.Bandwidth)
     bandwidth = bandwidth_node.text if bandwidth_node is not None else None
     if ((enddevice.lower() == asic_name.lower()) and
             (startdevice.lower() != hostname.lower())):
@@ -222,13 +259,13 @@ def parse_asic_png(png, asic_name, hostname):
     devices = {}
     port_speeds = {}
     for child in png:
-        if child.tag == str(QName(ns, "DeviceInterfaceLinks")):
-            for link in child.findall(str(QName(ns, "DeviceLinkBase"))):
+        if child.tag == qn.DeviceInterfaceLinks:
+            for link in child.findall(qn.DeviceLinkBase):
                 # Chassis internal node is used in multi-asic device or chassis minigraph
                 # where the minigraph will contain the internal asic connectivity and
                 # external neighbor information. The ChassisInternal node will be used to
                 # determine if the link is internal to the device or chassis.
-                chassis_internal_node = link.find(str(QName(ns, "ChassisInternal")))
+                chassis_internal_node = link.find(qn.ChassisInternal)
                 chassis_internal = chassis_internal_node.text if chassis_internal_node is not None else "false"
 
                 # If the link is an external link include the external neighbor
@@ -242,8 +279,8 @@ def parse_asic_png(png, asic_name, hostname):
                     neighbors.update(int_neighbors)
                     port_speeds.update(int_port_speeds)
 
-        if child.tag == str(QName(ns, "Devices")):
-            for device in child.findall(str(QName(ns, "Device"))):
+        if child.tag == qn.Devices:
+            for device in child.findall(qn.Device):
                 (lo_prefix, mgmt_prefix, name, hwsku, d_type, deployment_id) = parse_device(device)
                 device_data = {'lo_addr': lo_prefix, 'type': d_type, 'mgmt_addr': mgmt_prefix, 'hwsku': hwsku }
                 if deployment_id:
@@ -260,86 +297,86 @@ def parse_dpg(dpg, hname):
             There is just one aclintf node in the minigraph
             Get the aclintfs node first.
         """
-        if aclintfs is None and child.find(str(QName(ns, "AclInterfaces"))) is not None:
-            aclintfs = child.find(str(QName(ns, "AclInterfaces")))
+        if aclintfs is None and child.find(qn.AclInterfaces) is not None:
+            aclintfs = child.find(qn.AclInterfaces)
         """
             In Multi-NPU platforms the mgmt intfs are defined only for the host not for individual asic
             There is just one mgmtintf node in the minigraph
             Get the mgmtintfs node first. We need mgmt intf to get mgmt ip in per asic dockers.
         """
-        if mgmtintfs is None and child.find(str(QName(ns, "ManagementIPInterfaces"))) is not None:
-            mgmtintfs = child.find(str(QName(ns, "ManagementIPInterfaces")))
+        if mgmtintfs is None and child.find(qn.ManagementIPInterfaces) is not None:
+            mgmtintfs = child.find(qn.ManagementIPInterfaces)
         
-        hostname = child.find(str(QName(ns, "Hostname")))
+        hostname = child.find(qn.Hostname)
         if hostname.text.lower() != hname.lower():
             continue
 
         vni = vni_default
-        vni_element = child.find(str(QName(ns, "VNI")))
+        vni_element = child.find(qn.VNI)
         if vni_element != None:
             if vni_element.text.isdigit():
                 vni = int(vni_element.text)
             else:
                 print >> sys.stderr, "VNI must be an integer (use default VNI %d instead)" % vni_default 
 
-        ipintfs = child.find(str(QName(ns, "IPInterfaces")))
+        ipintfs = child.find(qn.IPInterfaces)
         intfs = {}
-        for ipintf in ipintfs.findall(str(QName(ns, "IPInterface"))):
-            intfalias = ipintf.find(str(QName(ns, "AttachTo"))).text
+        for ipintf in ipintfs.findall(qn.IPInterface):
+            intfalias = ipintf.find(qn.AttachTo).text
             intfname = port_alias_map.get(intfalias, intfalias)
-            ipprefix = ipintf.find(str(QName(ns, "Prefix"))).text
+            ipprefix = ipintf.find(qn.Prefix).text
             intfs[(intfname, ipprefix)] = {}
 
-        lointfs = child.find(str(QName(ns, "LoopbackIPInterfaces")))
+        lointfs = child.find(qn.LoopbackIPInterfaces)
         lo_intfs = {}
-        for lointf in lointfs.findall(str(QName(ns1, "LoopbackIPInterface"))):
-            intfname = lointf.find(str(QName(ns, "AttachTo"))).text
-            ipprefix = lointf.find(str(QName(ns1, "PrefixStr"))).text
+        for lointf in lointfs.findall(qn1.LoopbackIPInterface):
+            intfname = lointf.find(qn.AttachTo).text
+            ipprefix = lointf.find(qn1.PrefixStr).text
             lo_intfs[(intfname, ipprefix)] = {}
 
-        mvrfConfigs = child.find(str(QName(ns, "MgmtVrfConfigs")))
+        mvrfConfigs = child.find(qn.MgmtVrfConfigs)
         mvrf = {}
         if mvrfConfigs != None:
-            mv = mvrfConfigs.find(str(QName(ns1, "MgmtVrfGlobal")))
+            mv = mvrfConfigs.find(qn1.MgmtVrfGlobal)
             if mv != None:
-                mvrf_en_flag = mv.find(str(QName(ns, "mgmtVrfEnabled"))).text
+                mvrf_en_flag = mv.find(qn.mgmtVrfEnabled).text
                 mvrf["vrf_global"] = {"mgmtVrfEnabled": mvrf_en_flag}
 
         mgmt_intf = {}
-        for mgmtintf in mgmtintfs.findall(str(QName(ns1, "ManagementIPInterface"))):
-            intfname = mgmtintf.find(str(QName(ns, "AttachTo"))).text
-            ipprefix = mgmtintf.find(str(QName(ns1, "PrefixStr"))).text
+        for mgmtintf in mgmtintfs.findall(qn1.ManagementIPInterface):
+            intfname = mgmtintf.find(qn.AttachTo).text
+            ipprefix = mgmtintf.find(qn1.PrefixStr).text
             mgmtipn = ipaddress.IPNetwork(ipprefix)
             gwaddr = ipaddress.IPAddress(int(mgmtipn.network) + 1)
             mgmt_intf[(intfname, ipprefix)] = {'gwaddr': gwaddr}
 
-        pcintfs = child.find(str(QName(ns, "PortChannelInterfaces")))
+        pcintfs = child.find(qn.PortChannelInterfaces)
         pc_intfs = []
         pcs = {}
         pc_members = {}
         intfs_inpc = [] # List to hold all the LAG member interfaces 
-        for pcintf in pcintfs.findall(str(QName(ns, "PortChannel"))):
-            pcintfname = pcintf.find(str(QName(ns, "Name"))).text
-            pcintfmbr = pcintf.find(str(QName(ns, "AttachTo"))).text
+        for pcintf in pcintfs.findall(qn.PortChannel):
+            pcintfname = pcintf.find(qn.Name).text
+            pcintfmbr = pcintf.find(qn.AttachTo).text
             pcmbr_list = pcintfmbr.split(';')
             pc_intfs.append(pcintfname)
             for i, member in enumerate(pcmbr_list):
                 pcmbr_list[i] = port_alias_map.get(member, member)
                 intfs_inpc.append(pcmbr_list[i])
                 pc_members[(pcintfname, pcmbr_list[i])] = {'NULL': 'NULL'}
-            if pcintf.find(str(QName(ns, "Fallback"))) != None:
-                pcs[pcintfname] = {'members': pcmbr_list, 'fallback': pcintf.find(str(QName(ns, "Fallback"))).text, 'min_links': str(int(math.ceil(len() * 0.75)))}
+            if pcintf.find(qn.Fallback) != None:
+                pcs[pcintfname] = {'members': pcmbr_list, 'fallback': pcintf.find(qn.Fallback).text, 'min_links': str(int(math.ceil(len() * 0.75)))}
             else:
                 pcs[pcintfname] = {'members': pcmbr_list, 'min_links': str(int(math.ceil(len(pcmbr_list) * 0.75)))}
 
-        vlanintfs = child.find(str(QName(ns, "VlanInterfaces")))
+        vlanintfs = child.find(qn.VlanInterfaces)
         vlan_intfs = []
         vlans = {}
         vlan_members = {}
-        for vintf in vlanintfs.findall(str(QName(ns, "VlanInterface"))):
-            vintfname = vintf.find(str(QName(ns, "Name"))).text
-            vlanid = vintf.find(str(QName(ns, "VlanID"))).text
-            vintfmbr = vintf.find(str(QName(ns, "AttachTo"))).text
+        for vintf in vlanintfs.findall(qn.VlanInterface):
+            vintfname = vintf.find(qn.Name).text
+            vlanid = vintf.find(qn.VlanID).text
+            vintfmbr = vintf.find(qn.AttachTo).text
             vmbr_list = vintfmbr.split(';')
             for i, member in enumerate(vmbr_list):
                 vmbr_list[i] = port_alias_map.get(member, member)
@@ -350,7 +387,7 @@ def parse_dpg(dpg, hname):
 
             # If this VLAN requires a DHCP relay agent, it will contain a <DhcpRelays> element
             # containing a list of DHCP server IPs
-            vintf_node = vintf.find(str(QName(ns, "DhcpRelays")))
+            vintf_node = vintf.find(qn.DhcpRelays)
             if vintf_node is not None and vintf_node.text is not None:
                 vintfdhcpservers = vintf_node.text
                 vdhcpserver_list = vintfdhcpservers.split(';')
@@ -362,16 +399,16 @@ def parse_dpg(dpg, hname):
             vlans[sonic_vlan_name] = vlan_attributes
 
         acls = {}
-        for aclintf in aclintfs.findall(str(QName(ns, "AclInterface"))):
-            if aclintf.find(str(QName(ns, "InAcl"))) is not None:
-                aclname = aclintf.find(str(QName(ns, "InAcl"))).text.upper().replace(" ", "_").replace("-", "_")
+        for aclintf in aclintfs.findall(qn.AclInterface):
+            if aclintf.find(qn.InAcl) is not None:
+                aclname = aclintf.find(qn.InAcl).text.upper().replace(" ", "_").replace("-", "_")
                 stage = "ingress"
-            elif aclintf.find(str(QName(ns, "OutAcl"))) is not None:
-                aclname = aclintf.find(str(QName(ns, "OutAcl"))).text.upper().replace(" ", "_").replace("-", "_")
+            elif aclintf.find(qn.OutAcl) is not None:
+                aclname = aclintf.find(qn.OutAcl).text.upper().replace(" ", "_").replace("-", "_")
                 stage = "egress"
             else:
                 system.exit("Error: 'AclInterface' must contain either an 'InAcl' or 'OutAcl' subelement.")
-            aclattach = aclintf.find(str(QName(ns, "AttachTo"))).text.split(';')
+            aclattach = aclintf.find(qn.AttachTo).text.split(';')
             acl_intfs = []
             is_mirror = False
             is_mirror_v6 = False
@@ -423,7 +460,7 @@ def parse_dpg(dpg, hname):
             else:
                 # This ACL has no interfaces to attach to -- consider this a control plane ACL
                 try:
-                    aclservice = aclintf.find(str(QName(ns, "Type"))).text
+                    aclservice = aclintf.find(qn.Type).text
 
                     # If we already have an ACL with this name and this ACL is bound to a different service,
                     # append the service to our list of services
@@ -452,22 +489,22 @@ def parse_cpg(cpg, hname):
     bgp_peers_with_range = {}
     for child in cpg:
         tag = child.tag
-        if tag == str(QName(ns, "PeeringSessions")):
-            for session in child.findall(str(QName(ns, "BGPSession"))):
-                start_router = session.find(str(QName(ns, "StartRouter"))).text
-                start_peer = session.find(str(QName(ns, "StartPeer"))).text
-                end_router = session.find(str(QName(ns, "EndRouter"))).text
-                end_peer = session.find(str(QName(ns, "EndPeer"))).text
-                rrclient = 1 if session.find(str(QName(ns, "RRClient"))) is not None else 0
-                if session.find(str(QName(ns, "HoldTime"))) is not None:
-                    holdtime = session.find(str(QName(ns, "HoldTime"))).text
+        if tag == qn.PeeringSessions:
+            for session in child.findall(qn.BGPSession):
+                start_router = session.find(qn.StartRouter).text
+                start_peer = session.find(qn.StartPeer).text
+                end_router = session.find(qn.EndRouter).text
+                end_peer = session.find(qn.EndPeer).text
+                rrclient = 1 if session.find(qn.RRClient) is not None else 0
+                if session.find(qn.HoldTime) is not None:
+                    holdtime = session.find(qn.HoldTime).text
                 else:
                     holdtime = 180
-                if session.find(str(QName(ns, "KeepAliveTime"))) is not None:
-                    keepalive = session.find(str(QName(ns, "KeepAliveTime"))).text
+                if session.find(qn.KeepAliveTime) is not None:
+                    keepalive = session.find(qn.KeepAliveTime).text
                 else:
                     keepalive = 60
-                nhopself = 1 if session.find(str(QName(ns, "NextHopSelf"))) is not None else 0
+                nhopself = 1 if session.find(qn.NextHopSelf) is not None else 0
                 if end_router.lower() == hname.lower():
                     bgp_sessions[start_peer.lower()] = {
                         'name': start_router,
@@ -486,27 +523,27 @@ def parse_cpg(cpg, hname):
                         'keepalive': keepalive,
                         'nhopself': nhopself
                     }
-        elif child.tag == str(QName(ns, "Routers")):
-            for router in child.findall(str(QName(ns1, "BGPRouterDeclaration"))):
-                asn = router.find(str(QName(ns1, "ASN"))).text
-                hostname = router.find(str(QName(ns1, "Hostname"))).text
+        elif child.tag == qn.Routers:
+            for router in child.findall(qn1.BGPRouterDeclaration):
+                asn = router.find(qn1.ASN).text
+                hostname = router.find(qn1.Hostname).text
                 if hostname.lower() == hname.lower():
                     myasn = asn
-                    peers = router.find(str(QName(ns1, "Peers")))
-                    for bgpPeer in peers.findall(str(QName(ns, "BGPPeer"))):
-                        addr = bgpPeer.find(str(QName(ns, "Address"))).text
-                        if bgpPeer.find(str(QName(ns1, "PeersRange"))) is not None: # FIXME: is better to check for type BGPPeerPassive
-                            name = bgpPeer.find(str(QName(ns1, "Name"))).text
-                            ip_range = bgpPeer.find(str(QName(ns1, "PeersRange"))).text
+                    peers = router.find(qn1.Peers)
+                    for bgpPeer in peers.findall(qn.BGPPeer):
+                        addr = bgpPeer.find(qn.Address).text
+                        if bgpPeer.find(qn1.PeersRange) is not None: # FIXME: is better to check for type BGPPeerPassive
+                            name = bgpPeer.find(qn1.Name).text
+                            ip_range = bgpPeer.find(qn1.PeersRange).text
                             ip_range_group = ip_range.split(';') if ip_range and ip_range != "" else []
                             bgp_peers_with_range[name] = {
                                 'name': name,
                                 'ip_range': ip_range_group
                             }
-                            if bgpPeer.find(str(QName(ns, "Address"))) is not None:
-                                bgp_peers_with_range[name]['src_address'] = bgpPeer.find(str(QName(ns, "Address"))).text
-                            if bgpPeer.find(str(QName(ns1, "PeerAsn"))) is not None:
-                                bgp_peers_with_range[name]['peer_asn'] = bgpPeer.find(str(QName(ns1, "PeerAsn"))).text
+                            if bgpPeer.find(qn.Address) is not None:
+                                bgp_peers_with_range[name]['src_address'] = bgpPeer.find(qn.Address).text
+                            if bgpPeer.find(qn1.PeerAsn) is not None:
+                                bgp_peers_with_range[name]['peer_asn'] = bgpPeer.find(qn1.PeerAsn).text
                 else:
                     for peer in bgp_sessions:
                         bgp_session = bgp_sessions[peer]
@@ -529,13 +566,13 @@ def parse_meta(meta, hname):
     deployment_id = None
     region = None
     cloudtype = None
-    device_metas = meta.find(str(QName(ns, "Devices")))
-    for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-        if device.find(str(QName(ns1, "Name"))).text.lower() == hname.lower():
-            properties = device.find(str(QName(ns1, "Properties")))
-            for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-                name = device_property.find(str(QName(ns1, "Name"))).text
-                value = device_property.find(str(QName(ns1, "Value"))).text
+    device_metas = meta.find(qn.Devices)
+    for device in device_metas.findall(qn1.DeviceMetadata):
+        if device.find(qn1.Name).text.lower() == hname.lower():
+            properties = device.find(qn1.Properties)
+            for device_property in properties.findall(qn1.DeviceProperty):
+                name = device_property.find(qn1.Name).text
+                value = device_property.find(qn1.Value).text
                 value_group = value.strip().split(';') if value and value != "" else []
                 if name == "DhcpResources":
                     dhcp_servers = value_group
@@ -559,14 +596,14 @@ def parse_meta(meta, hname):
 
 
 def parse_linkmeta(meta, hname):
-    link = meta.find(str(QName(ns, "Link")))
+    link = meta.find(qn.Link)
     linkmetas = {}
-    for linkmeta in link.findall(str(QName(ns1, "LinkMetadata"))):
+    for linkmeta in link.findall(qn1.LinkMetadata):
         port = None
         fec_disabled = None
 
         # Sample: ARISTA05T1:Ethernet1/33;switch-t0:fortyGigE0/4
-        key = linkmeta.find(str(QName(ns1, "Key"))).text
+        key = linkmeta.find(qn1.Key).text
         endpoints = key.split(';')
         for endpoint in endpoints:
             t = endpoint.split(':')
@@ -577,10 +614,10 @@ def parse_linkmeta(meta, hname):
             # Cannot find a matching hname, something went wrong
             continue
 
-        properties = linkmeta.find(str(QName(ns1, "Properties")))
-        for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-            name = device_property.find(str(QName(ns1, "Name"))).text
-            value = device_property.find(str(QName(ns1, "Value"))).text
+        properties = linkmeta.find(qn1.Properties)
+        for device_property in properties.findall(qn1.DeviceProperty):
+            name = device_property.find(qn1.Name).text
+            value = device_property.find(qn1.Value).text
             if name == "FECDisabled":
                 fec_disabled = value
 
@@ -592,29 +629,42 @@ def parse_linkmeta(meta, hname):
 
 def parse_asic_meta(meta, hname):
     sub_role = None
-    device_metas = meta.find(str(QName(ns, "Devices")))
-    for device in device_metas.findall(str(QName(ns1, "DeviceMetadata"))):
-        if device.find(str(QName(ns1, "Name"))).text.lower() == hname.lower():
-            properties = device.find(str(QName(ns1, "Properties")))
-            for device_property in properties.findall(str(QName(ns1, "DeviceProperty"))):
-                name = device_property.find(str(QName(ns1, "Name"))).text
-                value = device_property.find(str(QName(ns1, "Value"))).text
+    device_metas = meta.find(qn.Devices)
+    for device in device_metas.findall(qn1.DeviceMetadata):
+        if device.find(qn1.Name).text.lower() == hname.lower():
+            properties = device.find(qn1.Properties)
+            for device_property in properties.findall(qn1.DeviceProperty):
+                name = device_property.find(qn1.Name).text
+                value = device_property.find(qn1.Value).text
                 if name == "SubRole":
                     sub_role = value
     return sub_role
 
+def parse_asic_sub_roles(meta):
+    sub_roles = {}
+    device_metas = meta.find(qn.Devices)
+    for device in device_metas.findall(qn1.DeviceMetadata):
+        device_name = device.find(qn1.Name).text.lower()
+        properties = device.find(qn1.Properties)
+        for device_property in properties.findall(qn1.DeviceProperty):
+            name = device_property.find(qn1.Name).text
+            value = device_property.find(qn1.Value).text
+            if name == "SubRole":
+                sub_roles[device_name] = value
+    return sub_roles
+
 def parse_deviceinfo(meta, hwsku):
     port_speeds = {}
     port_descriptions = {}
-    for device_info in meta.findall(str(QName(ns, "DeviceInfo"))):
-        dev_sku = device_info.find(str(QName(ns, "HwSku"))).text
+    for device_info in meta.findall(qn.DeviceInfo):
+        dev_sku = device_info.find(qn.HwSku).text
         if dev_sku == hwsku:
-            interfaces = device_info.find(str(QName(ns, "EthernetInterfaces"))).findall(str(QName(ns1, "EthernetInterface")))
-            interfaces = interfaces + device_info.find(str(QName(ns, "ManagementInterfaces"))).findall(str(QName(ns1, "ManagementInterface")))
+            interfaces = device_info.find(qn.EthernetInterfaces).findall(qn1.EthernetInterface)
+            interfaces = interfaces + device_info.find(qn.ManagementInterfaces).findall(qn1.ManagementInterface)
             for interface in interfaces:
-                alias = interface.find(str(QName(ns, "InterfaceName"))).text
-                speed = interface.find(str(QName(ns, "Speed"))).text
-                desc  = interface.find(str(QName(ns, "Description")))
+                alias = interface.find(qn.InterfaceName).text
+                speed = interface.find(qn.Speed).text
+                desc  = interface.find(qn.Description)
                 if desc != None:
                     port_descriptions[port_alias_map.get(alias, alias)] = desc.text
                 port_speeds[port_alias_map.get(alias, alias)] = speed
@@ -752,27 +802,158 @@ def filter_acl_table_bindings(acls, neighbors, port_channels, sub_role):
 
     return filter_acls
 
-def enable_internal_bgp_session(bgp_sessions, filename, asic_name):
+def enable_internal_bgp_session(bgp_sessions, asic_sub_roles, asic_name):
     '''
     In Multi-NPU session the internal sessions will always be up.
     So adding the admin-status 'up' configuration to bgp sessions
     BGP session between FrontEnd and BackEnd Asics are internal bgp sessions
+    asic_sub_roles maps lower case device names to their SubRole metadata.
     '''
-    local_sub_role = parse_asic_sub_role(filename, asic_name)
+    local_sub_role = asic_sub_roles.get(asic_name.lower())
 
     for peer_ip in bgp_sessions.keys():
         peer_name = bgp_sessions[peer_ip]['name']
-        peer_sub_role = parse_asic_sub_role(filename, peer_name)
+        peer_sub_role = asic_sub_roles.get(peer_name.lower())
         if ((local_sub_role == FRONTEND_ASIC_SUB_ROLE and peer_sub_role == BACKEND_ASIC_SUB_ROLE) or
             (local_sub_role == BACKEND_ASIC_SUB_ROLE and peer_sub_role == FRONTEND_ASIC_SUB_ROLE)):
             bgp_sessions[peer_ip].update({'admin_status': 'up'})
 
+###############################################################################
+#
+# Parsed result cache
+#
+###############################################################################
+
+def file_sha256(filename):
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def get_code_version():
+    """ Hash of the parser source, so that cached results are dropped on upgrade """
+    sha = hashlib.sha256()
+    for module_file in [__file__, sys.modules[get_port_config.__module__].__file__]:
+        source_file = os.path.splitext(module_file)[0] + '.py'
+        sha.update(file_sha256(source_file if os.path.isfile(source_file) else module_file))
+    return sha.hexdigest()
+
+def get_minigraph_cache_key(filename, platform, port_config_file, asic_name):
+    key = [get_code_version(), file_sha256(filename), str(platform), str(asic_name)]
+    if port_config_file:
+        key += [os.path.abspath(port_config_file), file_sha256(port_config_file)]
+    return hashlib.sha256('\0'.join(key)).hexdigest()
+
+def get_implicit_port_config(hwsku, platform, asic_name):
+    """ Port config file picked by parse_xml when none is given, with its hash """
+    asic_id = get_npu_id_from_name(asic_name) if asic_name is not None else None
+    port_config_file = get_port_config_file_name(hwsku, platform, asic_id)
+    if port_config_file is None:
+        return None
+    return (port_config_file, file_sha256(port_config_file))
+
+def ordered_copy(value):
+    """ Copy of the dicts of value as OrderedDicts, in the order they are
+        iterated. Unpickled dicts are not iterated in the order of the pickled
+        ones, so the data built from them would not give the same outputs. """
+    if isinstance(value, dict):
+        return OrderedDict((key, ordered_copy(item)) for key, item in value.iteritems())
+    return value
+
+def load_minigraph_cache(cache_dir, key, platform, port_config_file, asic_name):
+    """ Return cached parse_xml results and the warnings printed by the parse,
+        or None if there is no valid entry """
+    try:
+        with open(os.path.join(cache_dir, key + '.pickle'), 'rb') as f:
+            entry = pickle.load(f)
+        if not port_config_file:
+            if entry['port_config'] != get_implicit_port_config(entry['hwsku'], platform, asic_name):
+                return None
+    except Exception:
+        return None
+    port_alias_map.clear()
+    port_alias_map.update(entry['port_alias_map'])
+    port_alias_asic_map.clear()
+    port_alias_asic_map.update(entry['port_alias_asic_map'])
+    return (entry['results'], entry['warnings'])
+
+def store_minigraph_cache(cache_dir, key, results, warnings, platform, port_config_file, asic_name):
+    """ Atomically write parse_xml results to the cache, keeping only the most
+        recent MINIGRAPH_CACHE_MAX_ENTRIES entries. Failures are ignored. """
+    tmp_file = None
+    try:
+        hwsku = results['DEVICE_METADATA']['localhost']['hwsku']
+        entry = {
+            'hwsku': hwsku,
+            'port_config': None if port_config_file else get_implicit_port_config(hwsku, platform, asic_name),
+            'port_alias_map': port_alias_map,
+            'port_alias_asic_map': port_alias_asic_map,
+            'results': ordered_copy(results),
+            'warnings': warnings
+        }
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        (fd, tmp_file) = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_file, os.path.join(cache_dir, key + '.pickle'))
+        tmp_file = None
+
+        entries = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.pickle')]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for old_entry in entries[MINIGRAPH_CACHE_MAX_ENTRIES:]:
+            os.remove(old_entry)
+    except Exception as e:
+        print >> sys.stderr, "Warning: cannot write minigraph cache in %s: %s" % (cache_dir, e)
+        if tmp_file is not None:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
 ###############################################################################
 #
 # Main functions
 #
 ###############################################################################
-def parse_xml(filename, platform=None, port_config_file=None, asic_name=None):
+def iterparse_sections(filename):
+    """ Yield the top level elements of a minigraph file one by one, as they
+        are parsed by lxml iterparse. Once the consumer asks for the next one,
+        the previous element is cleared and removed from the tree, so the whole
+        document is never held in memory.
+    """
+    for _, elem in ET.iterparse(filename, events=('end',), tag=minigraph_section_tags):
+        parent = elem.getparent()
+        # Elements with the same tag may be nested inside a section
+        if parent is None or parent.getparent() is not None:
+            continue
+        yield elem
+        elem.clear()
+        while elem.getprevious() is not None:
+            del parent[0]
+
+def parse_graph_header(sections, asic_name=None):
+    """ Get the minigraph top level values which are needed before parsing
+        the other sections. asic_sub_roles is only collected for asic_name.
+    """
+    hwsku = None
+    hostname = None
+    docker_routing_config_mode = "separated"
+    asic_sub_roles = None
+
+    for child in sections:
+        if child.tag == qn.HwSku:
+            hwsku = child.text
+        if child.tag == qn.Hostname:
+            hostname = child.text
+        if child.tag == qn.DockerRoutingConfigMode:
+            docker_routing_config_mode = child.text
+        if asic_name is not None and asic_sub_roles is None and child.tag == qn.MetadataDeclaration:
+            asic_sub_roles = parse_asic_sub_roles(child)
+    return hwsku, hostname, docker_routing_config_mode, asic_sub_roles or {}
+
+def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, cache_dir=None):
     """ Parse minigraph xml file.
 
     Keyword arguments:
@@ -781,12 +962,73 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None):
     port_config_file -- port config file name
     asic_name -- asic name; to parse multi-asic device minigraph to 
     generate asic specific configuration.
+    cache_dir -- if set, results are cached in this directory, keyed by the
+    hash of the minigraph file, platform, port config file, asic name and
+    parser code. A cached result is dropped as soon as one of them changes.
+    Its dicts are OrderedDicts, iterated as the ones of the parse, and its
+    warnings are printed again.
      """
+    if cache_dir is not None:
+        key = get_minigraph_cache_key(filename, platform, port_config_file, asic_name)
+        cached = load_minigraph_cache(cache_dir, key, platform, port_config_file, asic_name)
+        if cached is not None:
+            (results, warnings) = cached
+            sys.stderr.write(warnings)
+            return results
+        saved_stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            results = parse_xml(filename, platform, port_config_file, asic_name)
+        finally:
+            warnings = sys.stderr.getvalue()
+            sys.stderr = saved_stderr
+            sys.stderr.write(warnings)
+        store_minigraph_cache(cache_dir, key, results, warnings, platform, port_config_file, asic_name)
+        return results
+
+    root = ET.parse(filename).getroot()
+    header = parse_graph_header(root, asic_name)
+    return parse_graph_sections(root, header, platform, port_config_file, asic_name)
+
+def parse_xml_asics(filename, asic_names, platform=None, port_config_files=None):
+    """ Parse a multi-asic minigraph xml file for several asics at once.
+
+    The document is only read once. Returns a dict of the parse_xml results
+    by asic name.
+
+    Keyword arguments:
+    filename -- minigraph file name
+    asic_names -- list of asic names
+    platform -- device platform
+    port_config_files -- dict of port config file names by asic name
+     """
+    port_config_files = port_config_files or {}
     root = ET.parse(filename).getroot()
+    results = {}
+    for asic_name in asic_names:
+        header = parse_graph_header(root, asic_name)
+        results[asic_name] = parse_graph_sections(root, header, platform, port_config_files.get(asic_name), asic_name)
+    return results
+
+def parse_xml_streaming(filename, platform=None, port_config_file=None, asic_name=None):
+    """ Parse minigraph xml file without building the whole document tree.
+
+    Same arguments and results as parse_xml. The file is read twice with
+    iterparse: once for the top level values, which come last in minigraph
+    files, and once for the sections, each of them freed once parsed. Peak
+    memory is bounded by the largest section instead of the whole document.
+     """
+    header = parse_graph_header(iterparse_sections(filename), asic_name)
+    return parse_graph_sections(iterparse_sections(filename), header, platform, port_config_file, asic_name)
+
+def parse_graph_sections(sections, header, platform=None, port_config_file=None, asic_name=None):
+    """ Build the config from the top level minigraph elements in sections,
+        header is the result of parse_graph_header.
+    """
+    (hwsku, hostname, docker_routing_config_mode, asic_sub_roles) = header
 
     u_neighbors = None
     u_devices = None
-    hwsku = None
     bgp_sessions = None
     bgp_monitors = []
     bgp_asn = None
@@ -801,7 +1043,6 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None):
     neighbors = None
     devices = None
     sub_role = None
-    docker_routing_config_mode = "separated"
     port_speeds_default = {}
     port_speed_png = {}
     port_descriptions = {}
@@ -816,7 +1057,6 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None):
     deployment_id = None
     region = None
     cloudtype = None
-    hostname = None
     linkmetas = {}
 
     # hostname is the asic_name, get the asic_id from the asic_name
@@ -825,50 +1065,42 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None):
     else:
         asic_id = None
 
-    hwsku_qn = QName(ns, "HwSku")
-    hostname_qn = QName(ns, "Hostname")
-    docker_routing_config_mode_qn = QName(ns, "DockerRoutingConfigMode")
-    for child in root:
-        if child.tag == str(hwsku_qn):
-            hwsku = child.text
-        if child.tag == str(hostname_qn):
-            hostname = child.text
-        if child.tag == str(docker_routing_config_mode_qn):
-            docker_routing_config_mode = child.text
-
     (ports, alias_map, alias_asic_map) = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic=asic_id)
+    # Drop the maps of a graph parsed earlier by the same process
+    port_alias_map.clear()
+    port_alias_asic_map.clear()
     port_alias_map.update(alias_map)
     port_alias_asic_map.update(alias_asic_map)
 
-    for child in root:
+    for child in sections:
         if asic_name is None:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == qn.DpgDec:
                 (intfs, lo_intfs, mvrf, mgmt_intf, vlans, vlan_members, pcs, pc_members, acls, vni) = parse_dpg(child, hostname)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == qn.CpgDec:
                 (bgp_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors) = parse_cpg(child, hostname)
-            elif child.tag == str(QName(ns, "PngDec")):
+            elif child.tag == qn.PngDec:
                 (neighbors, devices, console_dev, console_port, mgmt_dev, mgmt_port, port_speed_png, console_ports) = parse_png(child, hostname)
-            elif child.tag == str(QName(ns, "UngDec")):
+            elif child.tag == qn.UngDec:
                 (u_neighbors, u_devices, _, _, _, _, _, _) = parse_png(child, hostname)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == qn.MetadataDeclaration:
                 (syslog_servers, dhcp_servers, ntp_servers, tacacs_servers, mgmt_routes, erspan_dst, deployment_id, region, cloudtype) = parse_meta(child, hostname)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == qn.LinkMetadataDeclaration:
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == qn.DeviceInfos:
                 (port_speeds_default, port_descriptions) = parse_deviceinfo(child, hwsku)
         else:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == qn.DpgDec:
                 (intfs, lo_intfs, mvrf, mgmt_intf, vlans, vlan_members, pcs, pc_members, acls, vni) = parse_dpg(child, asic_name)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == qn.CpgDec:
                 (bgp_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors) = parse_cpg(child, asic_name)
-                enable_internal_bgp_session(bgp_sessions, filename, asic_name)
-            elif child.tag == str(QName(ns, "PngDec")):
+                enable_internal_bgp_session(bgp_sessions, asic_sub_roles, asic_name)
+            elif child.tag == qn.PngDec:
                 (neighbors, devices, port_speed_png) = parse_asic_png(child, asic_name, hostname)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == qn.MetadataDeclaration:
                 (sub_role) = parse_asic_meta(child, asic_name)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == qn.LinkMetadataDeclaration:
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == qn.DeviceInfos:
                 (port_speeds_default, port_descriptions) = parse_deviceinfo(child, hwsku)
 
     # set the host device type in asic metadata also
@@ -1158,9 +1390,8 @@ def parse_device_desc_xml(filename):
 def parse_asic_sub_role(filename, asic_name):
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
-    for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
+    for child in iterparse_sections(filename):
+        if child.tag == qn.MetadataDeclaration:
             sub_role = parse_asic_meta(child, asic_name)
             return sub_role
 
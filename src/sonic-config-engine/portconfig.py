@@ -2,8 +2,27 @@
 import os
 import sys
 
+# Port config file picked per (hwsku, platform, asic), and parsed content
+# per port config file, with the mtime and size it was parsed at. A picked
+# file is used as long as it exists, a parsed content as long as its file
+# is unchanged, so that a long lived process (sonic-cfggen --server) still
+# notices port config files being removed or edited.
+_port_config_file_name_cache = {}
+_port_config_cache = {}
+
 
 def get_port_config_file_name(hwsku=None, platform=None, asic=None):
+    key = (hwsku, platform, asic)
+    port_config_file = _port_config_file_name_cache.get(key)
+    if port_config_file and os.path.isfile(port_config_file):
+        return port_config_file
+    port_config_file = find_port_config_file_name(hwsku, platform, asic)
+    if port_config_file:
+        _port_config_file_name_cache[key] = port_config_file
+    return port_config_file
+
+
+def find_port_config_file_name(hwsku=None, platform=None, asic=None):
     port_config_candidates = []
     port_config_candidates.append('/usr/share/sonic/hwsku/port_config.ini')
     if hwsku:
@@ -25,42 +44,81 @@ def get_port_config(hwsku=None, platform=None, port_config_file=None, asic=None)
         port_config_file = get_port_config_file_name(hwsku, platform, asic)
         if not port_config_file:
             return ({}, {}, {})
-    return parse_port_config_file(port_config_file)
+    # Callers update the returned dicts, build new ones from the cached rows
+    return build_port_config(load_port_config_file(port_config_file)[0])
+
+
+def get_port_name_by_alias(alias, hwsku=None, platform=None, port_config_file=None, asic=None):
+    """ Return the SONiC name of the port with the given alias or asic port
+        name, or None if the port config file has no such port """
+    if not port_config_file:
+        port_config_file = get_port_config_file_name(hwsku, platform, asic)
+        if not port_config_file:
+            return None
+    return load_port_config_file(port_config_file)[1].get(alias)
+
+
+def load_port_config_file(port_config_file):
+    """ Return the rows of the port config file, as read_port_config_file()
+        does, and its alias to name map, memoized on the file mtime and
+        size. The returned values are shared, callers must not modify them. """
+    st = os.stat(port_config_file)
+    stamp = (st.st_mtime, st.st_size)
+    entry = _port_config_cache.get(port_config_file)
+    if entry is None or entry[0] != stamp:
+        rows = read_port_config_file(port_config_file)
+        entry = (stamp, rows, build_port_config(rows)[1])
+        _port_config_cache[port_config_file] = entry
+    return entry[1:]
 
 
 def parse_port_config_file(port_config_file):
-    ports = {}
-    port_alias_map = {}
-    port_alias_asic_map = {}
+    return build_port_config(read_port_config_file(port_config_file))
+
+
+def read_port_config_file(port_config_file):
+    """ Return the ports of the port config file, in file order, as a list
+        of (name, [(column title, value), ...]) """
+    rows = []
     # Default column definition
     titles = ['name', 'lanes', 'alias', 'index']
-    with open(port_config_file) as data:
-        for line in data:
+    columns = None
+    with open(port_config_file) as f:
+        for line in f:
             if line.startswith('#'):
                 if "name" in line:
                     titles = line.strip('#').split()
-                continue;
+                    columns = None
+                continue
             tokens = line.split()
             if len(tokens) < 2:
                 continue
-            name_index = titles.index('name')
-            name = tokens[name_index]
-            data = {}
-            for i, item in enumerate(tokens):
-                if i == name_index:
-                    continue
-                data[titles[i]] = item
-            data.setdefault('alias', name)
-            ports[name] = data
-            port_alias_map[data['alias']] = name
-            # asic_port_name to sonic_name mapping also included in
-            # port_alias_map
-            if (('asic_port_name' in data) and
-                (data['asic_port_name'] != name)):
-                port_alias_map[data['asic_port_name']] = name
-            # alias to asic_port_name mapping
-            if 'asic_port_name' in data:
-                port_alias_asic_map[data['alias']] = data['asic_port_name'].strip()
-    return (ports, port_alias_map, port_alias_asic_map)
+            if columns is None:
+                # Column indexes are computed once per title line, not
+                # for every port line
+                name_index = titles.index('name')
+                columns = [(i, title) for i, title in enumerate(titles) if i != name_index]
+            if len(tokens) > len(titles):
+                raise IndexError("{}: more values than columns in '{}'".format(port_config_file, line.strip()))
+            rows.append((tokens[name_index], [(title, tokens[i]) for i, title in columns if i < len(tokens)]))
+    return rows
 
 
+def build_port_config(rows):
+    ports = {}
+    port_alias_map = {}
+    port_alias_asic_map = {}
+    for name, items in rows:
+        data = dict(items)
+        data.setdefault('alias', name)
+        ports[name] = data
+        port_alias_map[data['alias']] = name
+        # asic_port_name to sonic_name mapping also included in
+        # port_alias_map
+        if (('asic_port_name' in data) and
+            (data['asic_port_name'] != name)):
+            port_alias_map[data['asic_port_name']] = name
+        # alias to asic_port_name mapping
+        if 'asic_port_name' in data:
+            port_alias_asic_map[data['alias']] = data['asic_port_name'].strip()
+    return (ports, port_alias_map, port_alias_asic_map)
@@ -16,8 +16,8 @@ setup(name='sonic-config-engine',
       author='Taoyu Li',
       author_email='taoyl@microsoft.com',
       url='https://github.com/Azure/sonic-buildimage',
-      py_modules=['portconfig', 'minigraph', 'openconfig_acl', 'sonic_device_util', 'config_samples', 'redis_bcc', 'lazy_re'],
-      scripts=['sonic-cfggen'],
+      py_modules=['portconfig', 'minigraph', 'openconfig_acl', 'sonic_device_util', 'config_samples', 'redis_bcc', 'lazy_re', 'cfggen_server', 'configdb_snapshot', 'configdb_diff', 'lazy_import', 'layered_bcc'],
+      scripts=['sonic-cfggen', 'sonic-cfggen-client'],
       install_requires=['lxml', 'jinja2>=2.10', 'netaddr', 'ipaddr', 'pyyaml', 'pyangbind==0.6.0'],
       test_suite='setup.get_test_suite',
       data_files=[
@@ -1,11 +1,17 @@
 #!/usr/bin/env python
 import os
-import yaml
 import subprocess
 import re
-from natsort import natsorted
 import glob
-from swsssdk import ConfigDBConnector, SonicDBConfig
+import json
+import tempfile
+from lazy_import import lazy_import
+
+# Only needed by some of the functions, imported on first use
+yaml = lazy_import('yaml')
+natsort = lazy_import('natsort')
+swsssdk = lazy_import('swsssdk')
+multiprocessing_pool = lazy_import('multiprocessing.pool')
 
 DOCUMENTATION = '''
 ---
@@ -21,16 +27,144 @@ TODO: this file shall be renamed and moved to other places in future
 to have it shared with multiple applications. 
 '''
 SONIC_DEVICE_PATH = '/usr/share/sonic/device'
+MACHINE_CONF_PATH = '/host/machine.conf'
+SONIC_VERSION_FILE = '/etc/sonic/sonic_version.yml'
+PLATFORM_IDENTITY_FILE = '/run/sonic/platform_identity.json'
+PLATFORM_IDENTITY_VERSION = 1
 NPU_NAME_PREFIX = 'asic'
 NAMESPACE_PATH_GLOB = '/run/netns/*'
 ASIC_CONF_FILENAME = 'asic.conf'
 FRONTEND_ASIC_SUB_ROLE = 'FrontEnd'
 BACKEND_ASIC_SUB_ROLE = 'BackEnd'
+MAX_NAMESPACE_QUERIES = 8
+
+#
+# Platform identity cache
+#
+# The platform, asic count, system MACs and routing stack of the device are
+# resolved at most once, and stored in PLATFORM_IDENTITY_FILE together with
+# the size and mtime of the files they were read from: machine.conf,
+# sonic_version.yml and the asic.conf of the platform. Every process loads
+# the identity file once, and later calls only stat those files. Staleness
+# rules:
+#   - any change of machine.conf, sonic_version.yml or asic.conf, including
+#     the file being created or removed, drops the whole identity
+#   - system MACs and routing stack come from the hardware and the running
+#     containers, which do not change without a reboot. /run is cleared on
+#     reboot, so they are resolved again on next boot
+#   - values which cannot be resolved (no MAC, no bgp container running)
+#     are not cached, so they are resolved again on next call
+#   - an identity file of another PLATFORM_IDENTITY_VERSION is ignored
+# The hwsku is not part of the identity, as it comes from CONFIG_DB, which
+# can be reloaded at any time.
+#
+_platform_identity = None
+_machine_info_cache = None
+
+def get_file_stamp(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return [st.st_mtime, st.st_size]
+
+def get_identity_sources(platform):
+    sources = [MACHINE_CONF_PATH, SONIC_VERSION_FILE]
+    if platform:
+        sources.append(os.path.join(SONIC_DEVICE_PATH, platform, ASIC_CONF_FILENAME))
+    return dict((source, get_file_stamp(source)) for source in sources)
+
+def is_identity_valid(identity):
+    try:
+        if identity['version'] != PLATFORM_IDENTITY_VERSION:
+            return False
+        return all(get_file_stamp(source) == stamp for source, stamp in identity['sources'].items())
+    except (KeyError, TypeError, AttributeError):
+        return False
+
+def load_platform_identity():
+    try:
+        with open(PLATFORM_IDENTITY_FILE) as f:
+            identity = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    # Give back str values, as they were resolved, not unicode ones
+    if isinstance(identity, dict):
+        for key, value in identity.items():
+            if isinstance(value, unicode):
+                identity[key] = value.encode('utf-8')
+    return identity
+
+def store_platform_identity(identity):
+    """ Atomically replace the identity file, other processes may read it.
+        Failures are ignored, the identity is then only cached in process """
+    directory = os.path.dirname(PLATFORM_IDENTITY_FILE)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        (fd, tmp_file) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(identity, f)
+        os.chmod(tmp_file, 0644)
+        os.rename(tmp_file, PLATFORM_IDENTITY_FILE)
+    except (IOError, OSError):
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+def get_platform_identity():
+    global _platform_identity
+    identity = _platform_identity
+    if identity is None:
+        identity = load_platform_identity()
+    if not is_identity_valid(identity):
+        platform = get_platform_info(get_machine_info())
+        identity = {
+            'version': PLATFORM_IDENTITY_VERSION,
+            'sources': get_identity_sources(platform),
+            'platform': platform,
+        }
+        store_platform_identity(identity)
+    _platform_identity = identity
+    return identity
+
+def get_identity_value(key, resolve):
+    identity = get_platform_identity()
+    if key not in identity:
+        value = resolve()
+        if value is None or value == '':
+            return value
+        identity[key] = value
+        store_platform_identity(identity)
+    return identity[key]
+
+def clear_platform_identity():
+    """ Drop the cached identity, in process and in PLATFORM_IDENTITY_FILE """
+    global _platform_identity, _machine_info_cache
+    _platform_identity = None
+    _machine_info_cache = None
+    try:
+        os.remove(PLATFORM_IDENTITY_FILE)
+    except OSError:
+        pass
+
 def get_machine_info():
-    if not os.path.isfile('/host/machine.conf'):
+    global _machine_info_cache
+    stamp = get_file_stamp(MACHINE_CONF_PATH)
+    if _machine_info_cache is None or _machine_info_cache[0] != stamp:
+        _machine_info_cache = (stamp, read_machine_info())
+    machine_vars = _machine_info_cache[1]
+    return dict(machine_vars) if machine_vars is not None else None
+
+def read_machine_info():
+    if not os.path.isfile(MACHINE_CONF_PATH):
         return None
     machine_vars = {}
-    with open('/host/machine.conf') as machine_file:
+    with open(MACHINE_CONF_PATH) as machine_file:
         for line in machine_file:
             tokens = line.split('=')
             if len(tokens) < 2:
@@ -45,7 +179,10 @@ def get_npu_id_from_name(npu_name):
         return None
 
 def get_num_npus():
-    platform = get_platform_info(get_machine_info())
+    return get_identity_value('num_npus', read_num_npus)
+
+def read_num_npus():
+    platform = get_platform_identity()['platform']
     if not platform:
         return 1
     asic_conf_file_path = os.path.join(SONIC_DEVICE_PATH, platform, ASIC_CONF_FILENAME)
@@ -69,24 +206,16 @@ def get_namespaces():
     for path in glob.glob(NAMESPACE_PATH_GLOB):
         ns = os.path.basename(path)
         ns_list.append(ns)
-    return natsorted(ns_list)
+    return natsort.natsorted(ns_list)
 
 def get_hwsku():
-    config_db = ConfigDBConnector()
+    config_db = swsssdk.ConfigDBConnector()
     config_db.connect()
     metadata = config_db.get_table('DEVICE_METADATA')
     return metadata['localhost']['hwsku']
 
 def get_platform():
-    if not os.path.isfile('/host/machine.conf'):
-        return ''
- 
-    with open('/host/machine.conf') as machine_conf:
-        for line in machine_conf:
-            tokens = line.split('=')
-            if tokens[0].strip() == 'onie_platform' or tokens[0].strip() == 'aboot_platform':
-                return tokens[1].strip()
-    return ''
+    return get_platform_identity()['platform'] or ''
 
 def is_multi_npu():
     num_npus = get_num_npus()
@@ -101,22 +230,33 @@ def get_all_namespaces():
     front_ns = []
     back_ns = []
     num_npus = get_num_npus()
-    SonicDBConfig.load_sonic_global_db_config()
+    swsssdk.SonicDBConfig.load_sonic_global_db_config()
     
-    if is_multi_npu():
-        for npu in range(num_npus):
-            namespace = "{}{}".format(NPU_NAME_PREFIX, npu)
-            config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
-            config_db.connect()
-
-            metadata = config_db.get_table('DEVICE_METADATA')
-            if metadata['localhost']['sub_role'] == FRONTEND_ASIC_SUB_ROLE:
+    if num_npus > 1:
+        namespaces = ["{}{}".format(NPU_NAME_PREFIX, npu) for npu in range(num_npus)]
+        # The config DB of every namespace is queried at the same time
+        pool = multiprocessing_pool.ThreadPool(min(num_npus, MAX_NAMESPACE_QUERIES))
+        try:
+            sub_roles = pool.map(get_namespace_sub_role, namespaces)
+        finally:
+            pool.close()
+            pool.join()
+
+        for namespace, sub_role in zip(namespaces, sub_roles):
+            if sub_role == FRONTEND_ASIC_SUB_ROLE:
                 front_ns.append(namespace)
-            elif metadata['localhost']['sub_role'] == BACKEND_ASIC_SUB_ROLE:
+            elif sub_role == BACKEND_ASIC_SUB_ROLE:
                 back_ns.append(namespace)
 
     return {'front_ns':front_ns, 'back_ns':back_ns}
 
+def get_namespace_sub_role(namespace):
+    config_db = swsssdk.ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
+    config_db.connect()
+
+    metadata = config_db.get_table('DEVICE_METADATA')
+    return metadata['localhost']['sub_role']
+
 def get_platform_info(machine_info):
     if machine_info != None:
         if machine_info.has_key('onie_platform'):
@@ -126,10 +266,10 @@ def get_platform_info(machine_info):
     return None
 
 def get_sonic_version_info():
-    if not os.path.isfile('/etc/sonic/sonic_version.yml'):
+    if not os.path.isfile(SONIC_VERSION_FILE):
         return None
     data = {}
-    with open('/etc/sonic/sonic_version.yml') as stream:
+    with open(SONIC_VERSION_FILE) as stream:
         if yaml.__version__ >= "5.1":
             data = yaml.full_load(stream)
         else:
@@ -140,6 +280,11 @@ def valid_mac_address(mac):
     return bool(re.match("^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$", mac))
 
 def get_system_mac(namespace=None):
+    # Cached per namespace, as each asic namespace has its own eth0
+    identity_key = 'system_mac' if namespace is None else 'system_mac:' + namespace
+    return get_identity_value(identity_key, lambda: read_system_mac(namespace))
+
+def read_system_mac(namespace=None):
     version_info = get_sonic_version_info()
 
     if (version_info['asic_type'] == 'mellanox'):
@@ -195,6 +340,9 @@ def get_system_mac(namespace=None):
 # suitable location is identified as part of upcoming refactoring efforts.
 #
 def get_system_routing_stack():
+    return get_identity_value('routing_stack', read_system_routing_stack)
+
+def read_system_routing_stack():
     command = "sudo docker ps | grep bgp | awk '{print$2}' | cut -d'-' -f3 | cut -d':' -f1"
 
     try:
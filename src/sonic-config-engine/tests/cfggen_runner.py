@@ -0,0 +1,87 @@
+"""Run sonic-cfggen for the tests.
+
+By default sonic-cfggen is loaded once and its main() is called in the test
+process with stdout and stderr captured, as the render server does, which
+saves the start of a python process and the module imports for each run.
+The module state which a new process would not have, such as server mode,
+its caches and the cached port config files and platform identity, is reset
+before each run. Set SONIC_CFGGEN_TEST_SUBPROCESS=1 to run every command in
+a new sonic-cfggen process instead.
+"""
+
+import imp
+import os
+import shlex
+import subprocess
+import sys
+
+import cfggen_server
+import portconfig
+import sonic_device_util
+
+SCRIPT_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'sonic-cfggen')
+SUBPROCESS_ENV = 'SONIC_CFGGEN_TEST_SUBPROCESS'
+
+_cfggen = None
+
+
+def in_process():
+    return os.environ.get(SUBPROCESS_ENV, '') in ['', '0']
+
+
+def load_cfggen():
+    global _cfggen
+    if _cfggen is None:
+        _cfggen = imp.load_source('sonic_cfggen', SCRIPT_FILE)
+    return _cfggen
+
+
+def reset_state():
+    """ Reset the module state of sonic-cfggen to the one of a new process """
+    cfggen = load_cfggen()
+    cfggen._server_mode = False
+    for cache in [cfggen._file_data_cache, cfggen._configdb_cache, cfggen._configdb_snapshot_cache,
+                  cfggen._jinja2_env_cache, cfggen._network_cache, cfggen._prefix_attr_cache,
+                  portconfig._port_config_file_name_cache, portconfig._port_config_cache]:
+        cache.clear()
+    del cfggen._asic_args[:]
+    sonic_device_util._platform_identity = None
+    sonic_device_util._machine_info_cache = None
+
+
+def split_redirect(argv):
+    """ Split a trailing '> file' off a command line """
+    if len(argv) >= 2 and argv[-2] == '>':
+        return argv[:-2], argv[-1]
+    if argv and argv[-1].startswith('>') and len(argv[-1]) > 1:
+        return argv[:-1], argv[-1][1:]
+    return argv, None
+
+
+def check_output(script_file, argument, merge_stderr=False):
+    """ Equivalent of subprocess.check_output(script_file + ' ' + argument,
+        shell=True), with stderr=subprocess.STDOUT if merge_stderr is set.
+        The argument is split as a shell would, and may end by redirecting
+        the output to a file. """
+    if not in_process():
+        if merge_stderr:
+            return subprocess.check_output(script_file + ' ' + argument, stderr=subprocess.STDOUT, shell=True)
+        return subprocess.check_output(script_file + ' ' + argument, shell=True)
+
+    argv, output_file = split_redirect(shlex.split(argument))
+    cfggen = load_cfggen()
+    reset_state()
+    reply = cfggen_server.run_captured(cfggen.main, argv)
+    output = reply['stdout']
+    if output_file is not None:
+        with open(output_file, 'w') as f:
+            f.write(output)
+        output = ''
+    if merge_stderr:
+        # stderr is unbuffered, so a process writes it before its stdout
+        output = reply['stderr'] + output
+    else:
+        sys.stderr.write(reply['stderr'])
+    if reply['rc'] != 0:
+        raise subprocess.CalledProcessError(reply['rc'], script_file + ' ' + argument, output)
+    return output
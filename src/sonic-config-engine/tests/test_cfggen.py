@@ -1,6 +1,11 @@
 from unittest import TestCase
 import subprocess
 import os
+import json
+import shutil
+import tempfile
+
+import cfggen_runner
 
 TOR_ROUTER = 'ToRRouter'
 BACKEND_TOR_ROUTER = 'BackEndToRRouter'
@@ -22,9 +27,9 @@ class TestCfgGen(TestCase):
     def run_script(self, argument, check_stderr=False):
         print '\n    Running sonic-cfggen ' + argument
         if check_stderr:
-            output = subprocess.check_output(self.script_file + ' ' + argument, stderr=subprocess.STDOUT, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument, merge_stderr=True)
         else:
-            output = subprocess.check_output(self.script_file + ' ' + argument, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument)
 
         linecount = output.strip().count('\n')
         if linecount <= 0:
@@ -105,6 +110,30 @@ class TestCfgGen(TestCase):
         output = self.run_script(argument)
         self.assertEqual(output.strip(), 'value1\nvalue2')
 
+    def test_render_manifest(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            manifest_file = os.path.join(tmp_dir, 'manifest.json')
+            output_file = os.path.join(tmp_dir, 'output')
+            with open(manifest_file, 'w') as f:
+                json.dump([
+                    {'template': os.path.join(self.test_dir, 'test.j2'), 'output': output_file},
+                    {'template': os.path.join(self.test_dir, 'test.j2'), 'additional_data': {'yml_item': ['value3']}},
+                    {'template': os.path.join(self.test_dir, 'test.j2')}
+                ], f)
+            argument = '-y ' + os.path.join(self.test_dir, 'test.yml') + ' --manifest ' + manifest_file
+            output = self.run_script(argument, True)
+            self.assertEqual(output.strip(), 'value3\n\nvalue1\nvalue2')
+            with open(output_file) as f:
+                self.assertEqual(f.read().strip(), 'value1\nvalue2')
+            # the render time of each template is only printed with --timing
+            output = self.run_script(argument + ' --timing', True)
+            timings = [line for line in output.splitlines() if line.endswith(' ms')]
+            self.assertEqual(len(timings), 3)
+            self.assertTrue(all(line.startswith(os.path.join(self.test_dir, 'test.j2') + ': ') for line in timings))
+        finally:
+            shutil.rmtree(tmp_dir)
+
     # FIXME: This test depends heavily on the ordering of the interfaces and
     # it is not at all intuitive what that ordering should be. Could make it
     # more robust by adding better parsing logic.
@@ -0,0 +1,63 @@
+from unittest import TestCase
+import imp
+import os
+
+import netaddr
+
+cfggen = imp.load_source('sonic_cfggen', os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'sonic-cfggen'))
+
+
+class TestCfgGenFilters(TestCase):
+
+    def setUp(self):
+        cfggen._network_cache.clear()
+        cfggen._prefix_attr_cache.clear()
+
+    def test_unique_name(self):
+        items = [{'name': 'b'}, {'name': 'a'}, {'name': 'b', 'x': 1}, {'name': 'c'}, {'name': 'a'}]
+        self.assertEqual(cfggen.unique_name(items), [{'name': 'b'}, {'name': 'a'}, {'name': 'c'}])
+        self.assertEqual(cfggen.unique_name([]), [])
+
+    def test_ip_version(self):
+        for _ in range(2):
+            self.assertTrue(cfggen.is_ipv4('10.0.0.1/31'))
+            self.assertFalse(cfggen.is_ipv6('10.0.0.1/31'))
+            self.assertTrue(cfggen.is_ipv6(u'fc00::1/126'))
+            self.assertTrue(cfggen.is_ipv6('::ffff:10.0.0.1'))
+            self.assertFalse(cfggen.is_ipv4('fc00::1/126'))
+            self.assertTrue(cfggen.is_ipv4(netaddr.IPNetwork('10.0.0.1/31')))
+            for value in ['', None, 'Ethernet0', 'fc00::1::2', ['10.0.0.1'], {}]:
+                self.assertFalse(cfggen.is_ipv4(value))
+                self.assertFalse(cfggen.is_ipv6(value))
+
+    def test_prefix_attr(self):
+        for _ in range(2):
+            self.assertEqual(cfggen.prefix_attr('ip', '10.1.0.32/32'), '10.1.0.32')
+            self.assertEqual(cfggen.prefix_attr('network', '192.168.0.1/27'), '192.168.0.0')
+            self.assertEqual(cfggen.prefix_attr('prefixlen', 'fc00::7d/126'), '126')
+            self.assertEqual(cfggen.prefix_attr('netmask', '192.168.0.1/27'), '255.255.255.224')
+            self.assertEqual(cfggen.prefix_attr('broadcast', '192.168.0.1/27'), '192.168.0.31')
+            self.assertIsNone(cfggen.prefix_attr('ip', 'Vlan1000'))
+            self.assertIsNone(cfggen.prefix_attr('ip', ''))
+
+    def test_ip_network(self):
+        for _ in range(2):
+            self.assertEqual(str(cfggen.ip_network('10.1.1.1/16')), '10.1.0.0')
+            self.assertEqual(cfggen.ip_network('Vlan1000'), 'Invalid ip address Vlan1000')
+
+    def test_cache_keys(self):
+        # Equal values of different types may not parse the same
+        self.assertEqual(True, 1)
+        self.assertEqual(cfggen.prefix_attr('ip', 1), '1.0.0.0')
+        self.assertIsNone(cfggen.prefix_attr('ip', True))
+
+    def test_cache_size(self):
+        cfggen_size = cfggen.NETWORK_CACHE_SIZE
+        cfggen.NETWORK_CACHE_SIZE = 4
+        try:
+            for i in range(10):
+                self.assertEqual(cfggen.prefix_attr('ip', '10.0.0.{}/31'.format(i)), '10.0.0.{}'.format(i))
+                self.assertLessEqual(len(cfggen._network_cache), 4)
+                self.assertLessEqual(len(cfggen._prefix_attr_cache), 4)
+        finally:
+            cfggen.NETWORK_CACHE_SIZE = cfggen_size
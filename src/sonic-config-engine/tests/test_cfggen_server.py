@@ -0,0 +1,173 @@
+from unittest import TestCase
+import subprocess
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import cfggen_runner
+import cfggen_server
+
+
+class TestCfgGenServer(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.script_file = os.path.join(self.test_dir, '..', 'sonic-cfggen')
+        self.client_file = os.path.join(self.test_dir, '..', 'sonic-cfggen-client')
+        self.sample_graph_simple = os.path.join(self.test_dir, 'simple-sample-graph.xml')
+        self.sample_graph_t0 = os.path.join(self.test_dir, 't0-sample-graph.xml')
+        self.port_config = os.path.join(self.test_dir, 't0-sample-port-config.ini')
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, 'cfggen.sock')
+        self.env = dict(os.environ, SONIC_CFGGEN_SOCK=self.socket_path)
+        self.server = subprocess.Popen([self.script_file, '--server', self.socket_path])
+        for _ in range(100):
+            if os.path.exists(self.socket_path):
+                break
+            time.sleep(0.1)
+
+    def tearDown(self):
+        if self.server.poll() is None:
+            self.server.kill()
+            self.server.wait()
+        shutil.rmtree(self.tmp_dir)
+
+    def run_script(self, script, argument, stdin=None):
+        print '\n    Running {} {}'.format(os.path.basename(script), argument)
+        proc = subprocess.Popen(script + ' ' + argument, shell=True, env=self.env, stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, error = proc.communicate(stdin)
+        return proc.returncode, output, error
+
+    def assert_same_output(self, argument):
+        expected = self.run_script(self.script_file, argument)
+        for _ in range(2):
+            self.assertEqual(self.run_script(self.client_file, argument), expected)
+
+    def test_server_socket(self):
+        self.assertTrue(os.path.exists(self.socket_path))
+
+    def test_additional_json_data(self):
+        self.assert_same_output('-a \'{"key1":"value1"}\' -v key1')
+
+    def test_render_template(self):
+        self.assert_same_output('-y ' + os.path.join(self.test_dir, 'test.yml') + ' -t ' + os.path.join(self.test_dir, 'test.j2'))
+
+    def test_minigraph_var(self):
+        self.assert_same_output('-m "' + self.sample_graph_simple + '" -p "' + self.port_config + '" -v "PORT[\'Ethernet8\']"')
+
+    def test_minigraph_dict_var(self):
+        # The order of the dict and the parse warnings are the same for
+        # the request which parses the minigraph and the cached ones
+        self.assert_same_output('-m "' + self.sample_graph_t0 + '" -p "' + self.port_config + '" -v PORTCHANNEL')
+
+    def test_error_exit_code(self):
+        rc, _, _ = self.run_script(self.client_file, '-j /nonexistent.json -v key1')
+        self.assertNotEqual(rc, 0)
+
+    def test_stdin(self):
+        rc, output, _ = self.run_script(self.client_file, '-j /dev/stdin -v key1', stdin='{"key1": "value1"}')
+        self.assertEqual((rc, output), (0, 'value1\n'))
+
+    def test_environment(self):
+        reply = cfggen_server.run_captured(lambda: sys.stdout.write(os.environ.get('CFGGEN_TEST_VAR', '')),
+                                           env=dict(os.environ, CFGGEN_TEST_VAR='value1'))
+        self.assertEqual(reply['stdout'], 'value1')
+        self.assertNotIn('CFGGEN_TEST_VAR', os.environ)
+
+    def test_no_fallback_after_connect(self):
+        # A server which fails once it has accepted the request: the request
+        # is not run again by sonic-cfggen, it may have written to the DB
+        self.server.kill()
+        self.server.wait()
+        os.remove(self.socket_path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.socket_path)
+        sock.listen(1)
+        thread = threading.Thread(target=lambda: sock.accept()[0].close())
+        thread.start()
+        try:
+            rc, output, error = self.run_script(self.client_file, '-a \'{"key1":"value1"}\' -v key1')
+        finally:
+            thread.join()
+            sock.close()
+        self.assertNotEqual(rc, 0)
+        self.assertEqual(output, '')
+        self.assertIn('no reply from the server', error)
+
+    def test_relative_path(self):
+        argument = '-y test.yml -t test.j2'
+        expected = subprocess.check_output(self.script_file + ' ' + argument, shell=True, cwd=self.test_dir)
+        output = subprocess.check_output(self.client_file + ' ' + argument, shell=True, cwd=self.test_dir, env=self.env)
+        self.assertEqual(output, expected)
+
+    def test_fallback_without_server(self):
+        self.server.kill()
+        self.server.wait()
+        os.remove(self.socket_path)
+        self.assert_same_output('-a \'{"key1":"value1"}\' -v key1')
+
+
+class TestCfgGenServerMode(TestCase):
+    """ Caching of sonic-cfggen in server mode, run in the test process """
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.sample_graph_t0 = os.path.join(self.test_dir, 't0-sample-graph.xml')
+        self.port_config = os.path.join(self.test_dir, 't0-sample-port-config.ini')
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cfggen = cfggen_runner.load_cfggen()
+        cfggen_runner.reset_state()
+        self.cfggen._server_mode = True
+
+    def tearDown(self):
+        cfggen_runner.reset_state()
+        shutil.rmtree(self.tmp_dir)
+
+    def run_cfggen(self, argument):
+        reply = cfggen_server.run_captured(self.cfggen.main, argument)
+        return reply['rc'], reply['stdout'], reply['stderr']
+
+    def test_cached_file_data(self):
+        # The minigraph is parsed once, and its messages are printed again
+        # on each cache hit
+        argument = ['-m', self.sample_graph_t0, '-p', self.port_config, '-v', 'PORTCHANNEL']
+        first = self.run_cfggen(argument)
+        self.assertEqual(len(self.cfggen._file_data_cache), 1)
+        data = self.cfggen._file_data_cache.values()[0][1]
+        for _ in range(2):
+            self.assertEqual(self.run_cfggen(argument), first)
+        self.assertIs(self.cfggen._file_data_cache.values()[0][1], data)
+        cfggen_runner.reset_state()
+        self.assertEqual(self.run_cfggen(argument), first)
+
+    def test_changed_file_data(self):
+        # A cached file is parsed again once its modification time changes
+        json_file = os.path.join(self.tmp_dir, 'data.json')
+        with open(json_file, 'w') as f:
+            f.write('{"key1": "value1"}')
+        self.assertEqual(self.run_cfggen(['-j', json_file, '-v', 'key1']), (0, 'value1\n', ''))
+        with open(json_file, 'w') as f:
+            f.write('{"key1": "value2"}')
+        mtime = os.path.getmtime(json_file) + 10
+        os.utime(json_file, (mtime, mtime))
+        self.assertEqual(self.run_cfggen(['-j', json_file, '-v', 'key1']), (0, 'value2\n', ''))
+        self.assertEqual(len(self.cfggen._file_data_cache), 1)
+
+    def test_cached_jinja2_env(self):
+        argument = ['-y', os.path.join(self.test_dir, 'test.yml'), '-t', os.path.join(self.test_dir, 'test.j2')]
+        self.assertEqual(self.run_cfggen(argument), (0, 'value1\nvalue2\n\n', ''))
+        self.assertEqual(len(self.cfggen._jinja2_env_cache), 1)
+        env = self.cfggen._jinja2_env_cache.values()[0]
+        self.assertEqual(self.run_cfggen(argument), (0, 'value1\nvalue2\n\n', ''))
+        self.assertIs(self.cfggen._jinja2_env_cache.values()[0], env)
+
+    def test_no_cache_without_server_mode(self):
+        self.cfggen._server_mode = False
+        self.run_cfggen(['-y', os.path.join(self.test_dir, 'test.yml'), '-t', os.path.join(self.test_dir, 'test.j2')])
+        self.assertEqual(self.cfggen._file_data_cache, {})
+        self.assertEqual(self.cfggen._jinja2_env_cache, {})
@@ -0,0 +1,81 @@
+from unittest import TestCase
+import copy
+import imp
+import json
+import os
+from collections import OrderedDict
+
+import natsort
+
+cfggen = imp.load_source('sonic_cfggen', os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'sonic-cfggen'))
+
+
+def natsorted_dict(table):
+    return OrderedDict(natsort.natsorted(table.items()))
+
+
+class TestSortData(TestCase):
+
+    def setUp(self):
+        self.data = {
+            'PORT': dict(('Ethernet{}'.format(i), {'lanes': str(i), 'alias': 'etp{}'.format(i // 4)}) for i in range(0, 128, 4)),
+            'INTERFACE': {
+                'Ethernet8': {},
+                ('Ethernet8', '10.0.0.4/31'): {},
+                ('Ethernet8', 'fc00::9/126'): {},
+                'Ethernet0': {},
+                ('Ethernet0', '10.0.0.0/31'): {},
+            },
+            # Keys natsort does not tell apart are ordered by their value
+            'TIES': {'a01': {'z': 1}, 'a1': {'b': 1}, 'a001': {'y': 1}, 'b': 2},
+            'EMPTY': {},
+            'LIST': ['b', 'a'],
+        }
+
+    def test_order(self):
+        data = cfggen.sort_data(copy.deepcopy(self.data))
+        for table in ['PORT', 'INTERFACE', 'TIES', 'EMPTY']:
+            expected = natsorted_dict(self.data[table])
+            self.assertEqual(cfggen.natsort_keys(self.data[table]), expected.keys())
+            self.assertEqual(data[table].keys(), expected.keys())
+            self.assertEqual(list(data[table]), expected.keys())
+            self.assertEqual(data[table].items(), expected.items())
+            self.assertEqual(list(data[table].itervalues()), expected.values())
+            self.assertEqual(list(reversed(data[table])), list(reversed(expected)))
+            self.assertEqual(repr(data[table]), repr(expected))
+            self.assertEqual(json.dumps(data[table], skipkeys=True), json.dumps(expected, skipkeys=True))
+        self.assertEqual(data['LIST'], ['b', 'a'])
+
+    def test_sorted_once(self):
+        data = cfggen.sort_data(copy.deepcopy(self.data))
+        self.assertIsNone(data['PORT']._keys)
+        self.assertEqual(data['PORT']['Ethernet4']['alias'], 'etp1')
+        self.assertIsNone(data['PORT']._keys)
+        keys = data['PORT'].keys()
+        self.assertIs(data['PORT'].sorted_keys(), data['PORT'].sorted_keys())
+        self.assertEqual(cfggen.sort_data(data)['PORT'].keys(), keys)
+
+    def test_update(self):
+        data = cfggen.sort_data(copy.deepcopy(self.data))
+        table = data['PORT']
+        table.keys()
+        table['Ethernet2'] = {}
+        table.setdefault('Ethernet1', {})
+        table.update({'Ethernet3': {}})
+        del table['Ethernet4']
+        table.pop('Ethernet8')
+        self.assertEqual(table.keys()[:4], ['Ethernet0', 'Ethernet1', 'Ethernet2', 'Ethernet3'])
+        self.assertEqual(table.keys()[4], 'Ethernet12')
+
+        copied = copy.deepcopy(table)
+        copied['Ethernet5'] = {}
+        self.assertEqual(copied.keys()[3:5], ['Ethernet3', 'Ethernet5'])
+        self.assertNotIn('Ethernet5', table.keys())
+        self.assertEqual(table.copy().keys(), table.keys())
+
+    def test_render(self):
+        env = cfggen.get_jinja2_env(['/'])
+        template = env.from_string('{% for key, value in PORT.items() %}{{ key }} {% endfor %}'
+                                   '{% for key in INTERFACE|pfx_filter %}{{ key }} {% endfor %}{{ TIES }}')
+        self.assertEqual(template.render(cfggen.sort_data(copy.deepcopy(self.data))),
+                         template.render(dict((t, natsorted_dict(v) if type(v) is dict else v) for t, v in self.data.items())))
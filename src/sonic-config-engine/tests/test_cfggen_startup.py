@@ -0,0 +1,25 @@
+from unittest import TestCase
+import subprocess
+import os
+import sys
+
+# Modules which 'sonic-cfggen -a ... -v ...' must not import
+HEAVY_MODULES = ['jinja2', 'yaml', 'netaddr', 'natsort', 'lxml', 'ipaddr', 'swsssdk', 'redis', 'minigraph', 'multiprocessing']
+
+
+class TestCfgGenStartup(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.script_file = os.path.join(self.test_dir, '..', 'sonic-cfggen')
+
+    def test_var_imports(self):
+        code = '\n'.join([
+            'import imp, sys',
+            'cfggen = imp.load_source("sonic_cfggen", "{}")'.format(self.script_file),
+            'cfggen.main(["-a", "{\\"key1\\": \\"value1\\"}", "-v", "key1"])',
+            'print(" ".join(sorted(name for name, module in sys.modules.items() if module is not None)))'])
+        output = subprocess.check_output([sys.executable, '-c', code]).splitlines()
+        self.assertEqual(output[0], 'value1')
+        imported = set(name.split('.')[0] for name in output[1].split())
+        self.assertEqual(imported.intersection(HEAVY_MODULES), set())
@@ -1,7 +1,8 @@
 from unittest import TestCase
-import subprocess
 import os
 
+import cfggen_runner
+
 class TestCfgGenT2ChassisFe(TestCase):
 
     def setUp(self):
@@ -15,9 +16,9 @@ class TestCfgGenT2ChassisFe(TestCase):
     def run_script(self, argument, check_stderr=False):
         print '\n    Running sonic-cfggen ' + argument
         if check_stderr:
-            output = subprocess.check_output(self.script_file + ' ' + argument, stderr=subprocess.STDOUT, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument, merge_stderr=True)
         else:
-            output = subprocess.check_output(self.script_file + ' ' + argument, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument)
 
         linecount = output.strip().count('\n')
         if linecount <= 0:
@@ -0,0 +1,151 @@
+from unittest import TestCase
+import copy
+import fnmatch
+
+import configdb_diff
+
+
+class FakePipeline(object):
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        self.client.pipelines += 1
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+class FakeRedis(object):
+
+    def __init__(self, content):
+        self.content = content
+        self.writes = 0
+        self.pipelines = 0
+
+    def keys(self, pattern):
+        return [k for k in self.content if fnmatch.fnmatchcase(k, pattern)]
+
+    def hgetall(self, key):
+        return dict(self.content.get(key, {}))
+
+    def hmset(self, key, fields):
+        self.writes += 1
+        self.content.setdefault(key, {}).update(fields)
+
+    def delete(self, key):
+        self.writes += 1
+        self.content.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakeConfigDB(object):
+    """ The parts of swsssdk ConfigDBConnector used to write config """
+
+    db_name = 'CONFIG_DB'
+    TABLE_NAME_SEPARATOR = '|'
+
+    def __init__(self, content):
+        self.client = FakeRedis(content)
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+    @staticmethod
+    def serialize_key(key):
+        if type(key) is tuple:
+            return '|'.join(key)
+        return key
+
+    def typed_to_raw(self, typed_data):
+        if typed_data is None:
+            return None
+        elif typed_data == {}:
+            return {'NULL': 'NULL'}
+        raw_data = {}
+        for key in typed_data:
+            value = typed_data[key]
+            if type(value) is list:
+                raw_data[key + '@'] = ','.join(value)
+            else:
+                raw_data[key] = str(value)
+        return raw_data
+
+    def mod_config(self, data):
+        for table, table_data in data.items():
+            if table_data is None:
+                for key in self.client.keys(table.upper() + '|*'):
+                    self.client.delete(key)
+                continue
+            for key, entry in table_data.items():
+                _hash = '{}|{}'.format(table.upper(), self.serialize_key(key))
+                if entry is None:
+                    self.client.delete(_hash)
+                else:
+                    self.client.hmset(_hash, self.typed_to_raw(entry))
+
+
+class TestConfigDBDiff(TestCase):
+
+    def setUp(self):
+        self.content = {
+            'DEVICE_METADATA|localhost': {'hwsku': 'Force10-Z9100', 'hostname': 'switch'},
+            'PORT|Ethernet0': {'alias': 'fortyGigE0/0', 'speed': '40000'},
+            'PORT|Ethernet4': {'alias': 'fortyGigE0/4', 'speed': '40000'},
+            'VLAN|Vlan1000': {'vlanid': '1000', 'members@': 'Ethernet0,Ethernet4'},
+            'VLAN_MEMBER|Vlan1000|Ethernet0': {'tagging_mode': 'untagged'},
+            'ACL_TABLE|DATAACL': {'type': 'L3'},
+            'ACL_TABLE|EVERFLOW': {'type': 'MIRROR'},
+        }
+        self.data = {
+            'DEVICE_METADATA': {'localhost': {'hwsku': 'Force10-Z9100', 'hostname': 'switch'}},
+            'PORT': {
+                'Ethernet0': {'alias': 'fortyGigE0/0', 'speed': 40000},
+                'Ethernet4': {'alias': 'fortyGigE0/4', 'speed': 100000},
+                'Ethernet8': {'alias': 'fortyGigE0/8'},
+                'Ethernet12': None,
+            },
+            'VLAN': {'Vlan1000': {'vlanid': '1000', 'members': ['Ethernet0', 'Ethernet4']}},
+            'VLAN_MEMBER': {('Vlan1000', 'Ethernet0'): {'tagging_mode': 'untagged'}, ('Vlan1000', 'Ethernet4'): None},
+            'ACL_TABLE': None,
+            'LOOPBACK_INTERFACE': {'Loopback0': {}},
+        }
+
+    def test_same_result_as_mod_config(self):
+        expected = FakeConfigDB(copy.deepcopy(self.content))
+        expected.mod_config(self.data)
+        configdb = FakeConfigDB(copy.deepcopy(self.content))
+        configdb_diff.write_config_diff(configdb, self.data)
+        self.assertEqual(configdb.client.content, expected.client.content)
+
+    def test_diff(self):
+        configdb = FakeConfigDB(copy.deepcopy(self.content))
+        updates, deletes, unchanged = configdb_diff.diff_config(configdb, self.data)
+        self.assertEqual(updates, {
+            'PORT|Ethernet4': {'speed': '100000'},
+            'PORT|Ethernet8': {'alias': 'fortyGigE0/8'},
+            'LOOPBACK_INTERFACE|Loopback0': {'NULL': 'NULL'},
+        })
+        self.assertEqual(deletes, ['ACL_TABLE|DATAACL', 'ACL_TABLE|EVERFLOW'])
+        self.assertEqual(unchanged, 6)
+
+    def test_write_counts(self):
+        configdb = FakeConfigDB(copy.deepcopy(self.content))
+        self.assertEqual(configdb_diff.write_config_diff(configdb, self.data), (3, 2, 6))
+        self.assertEqual(configdb.client.writes, 5)
+        configdb.client.writes = 0
+        self.assertEqual(configdb_diff.write_config_diff(configdb, self.data), (0, 0, 9))
+        self.assertEqual(configdb.client.writes, 0)
+
+    def test_batches(self):
+        data = {'PORT': dict(('Ethernet{}'.format(i), {'index': i}) for i in range(100))}
+        configdb = FakeConfigDB({})
+        self.assertEqual(configdb_diff.write_config_diff(configdb, data, batch_size=30), (100, 0, 0))
+        # 4 pipelines to read and 4 to write
+        self.assertEqual(configdb.client.pipelines, 8)
+        self.assertEqual(configdb.client.content['PORT|Ethernet42'], {'index': '42'})
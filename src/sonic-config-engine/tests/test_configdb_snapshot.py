@@ -0,0 +1,145 @@
+from unittest import TestCase
+
+import redis
+
+import configdb_snapshot
+
+
+class FakePubSub(object):
+    """ Messages are first in transit, only a blocking get_message() waits
+        for them to be delivered """
+
+    def __init__(self):
+        self.messages = []
+        self.in_transit = []
+        self.patterns = []
+        self.channels = []
+
+    def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+        self.messages.append({'type': 'psubscribe', 'pattern': None, 'channel': pattern, 'data': 1})
+
+    def subscribe(self, channel):
+        self.channels.append(channel)
+        self.messages.append({'type': 'subscribe', 'pattern': None, 'channel': channel, 'data': 2})
+
+    def get_message(self, timeout=0):
+        if timeout > 0:
+            self.messages += self.in_transit
+            self.in_transit = []
+        if self.messages:
+            return self.messages.pop(0)
+        return None
+
+    def close(self):
+        pass
+
+
+class FakeRedis(object):
+
+    def __init__(self, events):
+        self.events = events
+        self.pubsubs = []
+
+    def config_get(self, name):
+        return {name: self.events}
+
+    def pubsub(self):
+        self.pubsubs.append(FakePubSub())
+        return self.pubsubs[-1]
+
+    def publish(self, channel, data):
+        for pubsub in self.pubsubs:
+            if channel in pubsub.channels:
+                pubsub.in_transit.append({'type': 'message', 'pattern': None, 'channel': channel, 'data': data})
+
+
+class FakeConfigDB(object):
+
+    db_name = 'CONFIG_DB'
+
+    def __init__(self, config, events='AKE'):
+        self.config = config
+        self.client = FakeRedis(events)
+        self.reads = 0
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+    def get_dbid(self, db_name):
+        return 4
+
+    def get_config(self):
+        self.reads += 1
+        return dict((t, dict(v)) for t, v in self.config.items())
+
+    def get_table(self, table):
+        self.reads += 1
+        return dict(self.config.get(table, {}))
+
+    def set_entry(self, table, key, data):
+        self.config.setdefault(table, {})[key] = data
+        for pubsub in self.client.pubsubs:
+            pubsub.in_transit.append({'type': 'pmessage', 'pattern': '__keyspace@4__:*',
+                                      'channel': '__keyspace@4__:{}|{}'.format(table, key), 'data': 'hset'})
+
+
+class TestConfigDBSnapshot(TestCase):
+
+    def setUp(self):
+        self.configdb = FakeConfigDB({
+            'DEVICE_METADATA': {'localhost': {'hwsku': 'Force10-Z9100'}},
+            'PORT': {'Ethernet0': {'alias': 'fortyGigE0/0'}}
+        })
+        self.snapshot = configdb_snapshot.ConfigDBSnapshot(self.configdb)
+
+    def test_unchanged(self):
+        config = self.snapshot.get_config()
+        self.assertEqual(config, self.configdb.config)
+        self.assertEqual(self.configdb.client.pubsubs[0].patterns, ['__keyspace@4__:*'])
+        config['PORT'] = {}
+        self.assertEqual(self.snapshot.get_config(), self.configdb.config)
+        self.assertEqual(self.configdb.reads, 1)
+
+    def test_changed(self):
+        self.snapshot.get_config()
+        self.configdb.set_entry('PORT', 'Ethernet4', {'alias': 'fortyGigE0/4'})
+        self.assertIn('Ethernet4', self.snapshot.get_config()['PORT'])
+        self.assertEqual(self.configdb.reads, 2)
+        self.snapshot.get_config()
+        self.assertEqual(self.configdb.reads, 2)
+
+    def test_barrier_timeout(self):
+        self.snapshot.get_config()
+        self.configdb.client.publish = lambda channel, data: None
+        saved_timeout = configdb_snapshot.BARRIER_TIMEOUT
+        configdb_snapshot.BARRIER_TIMEOUT = 0.01
+        try:
+            self.snapshot.get_config()
+        finally:
+            configdb_snapshot.BARRIER_TIMEOUT = saved_timeout
+        self.assertEqual(self.configdb.reads, 2)
+
+    def test_notifications_disabled(self):
+        self.configdb.client.events = ''
+        for _ in range(2):
+            self.assertEqual(self.snapshot.get_config(), self.configdb.config)
+        self.assertEqual(self.configdb.reads, 2)
+
+    def test_broken_subscription(self):
+        self.snapshot.get_config()
+
+        def get_message(timeout=0):
+            raise redis.exceptions.ConnectionError()
+        self.configdb.client.pubsubs[0].get_message = get_message
+        self.snapshot.get_config()
+        self.assertEqual(self.configdb.reads, 2)
+        self.snapshot.get_config()
+        self.assertEqual(self.configdb.reads, 3)
+        self.snapshot.get_config()
+        self.assertEqual(self.configdb.reads, 3)
+
+    def test_get_tables(self):
+        self.assertEqual(configdb_snapshot.get_tables(self.configdb, ['PORT', 'VLAN']),
+                         {'PORT': self.configdb.config['PORT']})
+        self.assertEqual(self.configdb.reads, 2)
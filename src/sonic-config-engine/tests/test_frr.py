@@ -3,6 +3,8 @@ import subprocess
 import os
 import filecmp
 
+import cfggen_runner
+
 
 class TestCfgGen(TestCase):
     def setUp(self):
@@ -22,9 +24,9 @@ class TestCfgGen(TestCase):
     def run_script(self, argument, check_stderr=False):
 #        print '\n    Running sonic-cfggen ' + argument
         if check_stderr:
-            output = subprocess.check_output(self.script_file + ' ' + argument, stderr=subprocess.STDOUT, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument, merge_stderr=True)
         else:
-            output = subprocess.check_output(self.script_file + ' ' + argument, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument)
 
         linecount = output.strip().count('\n')
         if linecount <= 0:
@@ -6,6 +6,8 @@ import shutil
 
 from unittest import TestCase
 
+import cfggen_runner
+
 class TestJ2FilesT2ChassisFe(TestCase):
     def setUp(self):
         self.test_dir = os.path.dirname(os.path.realpath(__file__))
@@ -24,7 +26,7 @@ class TestJ2FilesT2ChassisFe(TestCase):
 
     def run_script(self, argument):
         print 'CMD: sonic-cfggen ' + argument
-        return subprocess.check_output(self.script_file + ' ' + argument, shell=True)
+        return cfggen_runner.check_output(self.script_file, argument)
 
     def run_diff(self, file1, file2):
         return subprocess.check_output('diff -u {} {} || true'.format(file1, file2), shell=True)
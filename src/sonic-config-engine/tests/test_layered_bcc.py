@@ -0,0 +1,101 @@
+from unittest import TestCase
+import os
+import shutil
+import tempfile
+
+import jinja2
+
+from layered_bcc import FileBytecodeCache, LayeredBytecodeCache
+
+
+class DictBytecodeCache(jinja2.BytecodeCache):
+
+    def __init__(self):
+        self.content = {}
+        self.loads = 0
+
+    def load_bytecode(self, bucket):
+        self.loads += 1
+        if bucket.key in self.content:
+            bucket.bytecode_from_string(self.content[bucket.key])
+
+    def dump_bytecode(self, bucket):
+        self.content[bucket.key] = bucket.bytecode_to_string()
+
+
+class TestLayeredBytecodeCache(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        os.mkdir(self.cache_dir)
+        self.template = os.path.join(self.tmp_dir, 'test.j2')
+        self.write_template('{% for i in items %}{{ i }} {% endfor %}')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_template(self, source):
+        with open(self.template, 'w') as f:
+            f.write(source)
+
+    def render(self, bcc):
+        env = jinja2.Environment(loader=jinja2.FileSystemLoader(self.tmp_dir), bytecode_cache=bcc)
+        return env.get_template('test.j2').render(items=[1, 2])
+
+    def cache_files(self):
+        return [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir)]
+
+    def test_file_cache(self):
+        self.assertEqual(self.render(FileBytecodeCache(self.cache_dir)), '1 2 ')
+        self.assertEqual(len(self.cache_files()), 1)
+        self.assertTrue(self.cache_files()[0].endswith('.cache'))
+        self.assertEqual(self.render(FileBytecodeCache(self.cache_dir)), '1 2 ')
+
+    def test_file_cache_changed_source(self):
+        self.render(FileBytecodeCache(self.cache_dir))
+        self.write_template('{% for i in items %}{{ i * 2 }} {% endfor %}')
+        self.assertEqual(self.render(FileBytecodeCache(self.cache_dir)), '2 4 ')
+
+    def test_file_cache_corrupt_entry(self):
+        self.render(FileBytecodeCache(self.cache_dir))
+        for cache_file in self.cache_files():
+            with open(cache_file, 'wb') as f:
+                f.write('garbage')
+        self.assertEqual(self.render(FileBytecodeCache(self.cache_dir)), '1 2 ')
+
+    def test_file_cache_missing_directory(self):
+        shutil.rmtree(self.cache_dir)
+        self.assertEqual(self.render(FileBytecodeCache(self.cache_dir)), '1 2 ')
+
+    def test_layers(self):
+        second = DictBytecodeCache()
+        self.assertEqual(self.render(LayeredBytecodeCache([FileBytecodeCache(self.cache_dir), second])), '1 2 ')
+        self.assertEqual(len(second.content), 1)
+        self.assertEqual(len(self.cache_files()), 1)
+
+        # A hit in the first layer does not reach the second one
+        second.loads = 0
+        self.assertEqual(self.render(LayeredBytecodeCache([FileBytecodeCache(self.cache_dir), second])), '1 2 ')
+        self.assertEqual(second.loads, 0)
+
+        # A hit in the second layer is copied to the first one
+        os.remove(self.cache_files()[0])
+        self.assertEqual(self.render(LayeredBytecodeCache([FileBytecodeCache(self.cache_dir), second])), '1 2 ')
+        self.assertEqual(second.loads, 1)
+        self.assertEqual(len(self.cache_files()), 1)
+
+    def test_lazy_layer(self):
+        created = []
+
+        def create():
+            created.append(DictBytecodeCache())
+            return created[-1]
+
+        self.render(FileBytecodeCache(self.cache_dir))
+        self.assertEqual(self.render(LayeredBytecodeCache([FileBytecodeCache(self.cache_dir), create])), '1 2 ')
+        self.assertEqual(created, [])
+        shutil.rmtree(self.cache_dir)
+        os.mkdir(self.cache_dir)
+        self.assertEqual(self.render(LayeredBytecodeCache([FileBytecodeCache(self.cache_dir), create])), '1 2 ')
+        self.assertEqual(len(created), 1)
@@ -0,0 +1,121 @@
+from unittest import TestCase
+import os
+import shutil
+import tempfile
+
+import cfggen_runner
+import cfggen_server
+import minigraph
+
+
+class TestMinigraphCache(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.graph = os.path.join(self.tmp_dir, 'minigraph.xml')
+        self.port_config = os.path.join(self.tmp_dir, 'port_config.ini')
+        shutil.copy(os.path.join(self.test_dir, 't0-sample-graph.xml'), self.graph)
+        shutil.copy(os.path.join(self.test_dir, 't0-sample-port-config.ini'), self.port_config)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def cache_entries(self):
+        return sorted(f for f in os.listdir(self.cache_dir) if f.endswith('.pickle'))
+
+    def parse(self, **kwargs):
+        return minigraph.parse_xml(self.graph, port_config_file=self.port_config, cache_dir=self.cache_dir, **kwargs)
+
+    def test_cache_hit(self):
+        expected = minigraph.parse_xml(self.graph, port_config_file=self.port_config)
+        expected_alias_map = dict(minigraph.port_alias_map)
+        self.assertEqual(self.parse(), expected)
+        entries = self.cache_entries()
+        self.assertEqual(len(entries), 1)
+
+        minigraph.port_alias_map.clear()
+        self.assertEqual(self.parse(), expected)
+        self.assertEqual(self.cache_entries(), entries)
+        self.assertEqual(minigraph.port_alias_map, expected_alias_map)
+
+    def test_minigraph_change(self):
+        self.parse()
+        with open(self.graph) as f:
+            content = f.read()
+        with open(self.graph, 'w') as f:
+            f.write(content.replace('ARISTA04T1', 'ARISTA05T1'))
+        results = self.parse()
+        self.assertIn('ARISTA05T1', results['DEVICE_NEIGHBOR_METADATA'])
+        self.assertNotIn('ARISTA04T1', results['DEVICE_NEIGHBOR_METADATA'])
+        self.assertEqual(len(self.cache_entries()), 2)
+
+    def test_port_config_change(self):
+        self.assertIn('Ethernet0', self.parse()['PORT'])
+        with open(self.port_config) as f:
+            lines = f.readlines()
+        with open(self.port_config, 'w') as f:
+            f.writelines(line for line in lines if not line.startswith('Ethernet0 '))
+        self.assertNotIn('Ethernet0', self.parse()['PORT'])
+
+    def test_write_failure(self):
+        # A failed write leaves no temporary file in the cache directory
+        expected = minigraph.parse_xml(self.graph, port_config_file=self.port_config)
+        os.mkdir(self.cache_dir)
+        rename = os.rename
+        def failing_rename(src, dst):
+            raise OSError('rename failed')
+        os.rename = failing_rename
+        try:
+            self.assertEqual(self.parse(), expected)
+        finally:
+            os.rename = rename
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_corrupt_entry(self):
+        expected = self.parse()
+        for entry in self.cache_entries():
+            with open(os.path.join(self.cache_dir, entry), 'w') as f:
+                f.write('garbage')
+        self.assertEqual(self.parse(), expected)
+
+    def run_cfggen(self, argument):
+        # Not in server mode, so that each run parses or loads the cache
+        cfggen = cfggen_runner.load_cfggen()
+        server_mode = cfggen._server_mode
+        cfggen._server_mode = False
+        try:
+            return cfggen_server.run_captured(cfggen.main, ['-m', self.graph, '-p', self.port_config] + argument)
+        finally:
+            cfggen._server_mode = server_mode
+
+    def set_cfggen_cache_dir(self, cache_dir):
+        cfggen = cfggen_runner.load_cfggen()
+        cfggen.minigraph.parse_xml  # load the module behind the lazy import
+        minigraph.MINIGRAPH_CACHE_DIR = cfggen.minigraph.MINIGRAPH_CACHE_DIR = cache_dir
+
+    def test_cfggen_output(self):
+        # sonic-cfggen prints the same, warnings included, with a cold cache,
+        # a warm cache and without cache
+        tables = ['DEVICE_METADATA', 'PORT', 'PORTCHANNEL', 'VLAN_MEMBER', 'DEVICE_NEIGHBOR_METADATA',
+                  'TELEMETRY', 'LOOPBACK_INTERFACE', 'RESTAPI', 'ACL_TABLE']
+        saved_cache_dir = minigraph.MINIGRAPH_CACHE_DIR
+        try:
+            self.set_cfggen_cache_dir(os.path.join(self.tmp_dir, 'nonexistent'))
+            expected = [self.run_cfggen(['-v', table]) for table in tables] + [self.run_cfggen(['--print-data'])]
+            os.mkdir(self.cache_dir)
+            self.set_cfggen_cache_dir(self.cache_dir)
+            for _ in range(2):
+                outputs = [self.run_cfggen(['-v', table]) for table in tables] + [self.run_cfggen(['--print-data'])]
+                for output, expected_output in zip(outputs, expected):
+                    self.assertEqual((output['rc'], output['stdout'], output['stderr']),
+                                     (expected_output['rc'], expected_output['stdout'], expected_output['stderr']))
+            self.assertEqual(len(self.cache_entries()), 1)
+        finally:
+            self.set_cfggen_cache_dir(saved_cache_dir)
+
+    def test_prune(self):
+        for i in range(minigraph.MINIGRAPH_CACHE_MAX_ENTRIES + 2):
+            self.parse(platform='platform{}'.format(i))
+        self.assertEqual(len(self.cache_entries()), minigraph.MINIGRAPH_CACHE_MAX_ENTRIES)
@@ -0,0 +1,41 @@
+from unittest import TestCase
+import os
+
+import minigraph
+
+
+class TestMinigraphStreaming(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.port_config = os.path.join(self.test_dir, 't0-sample-port-config.ini')
+        self.multi_npu_graph = os.path.join(self.test_dir, 'multi_npu_data', 'sample-minigraph.xml')
+
+    def assert_same_results(self, graph, port_config=None, asic_name=None):
+        graph = os.path.join(self.test_dir, graph)
+        expected = minigraph.parse_xml(graph, port_config_file=port_config, asic_name=asic_name)
+        results = minigraph.parse_xml_streaming(graph, port_config_file=port_config, asic_name=asic_name)
+        self.assertEqual(results, expected)
+
+    def test_t0_graphs(self):
+        for graph in ['t0-sample-graph.xml', 't0-sample-graph-mvrf.xml', 't0-sample-bgp-speaker.xml',
+                      'simple-sample-graph.xml', 'simple-sample-graph-case.xml', 'simple-sample-graph-metadata.xml',
+                      'pc-test-graph.xml', 'sample_graph.xml']:
+            self.assert_same_results(graph, self.port_config)
+            self.assert_same_results(graph)
+
+    def test_t1_graph(self):
+        self.assert_same_results('t1-sample-graph-mlnx.xml')
+
+    def test_t2_chassis_graph(self):
+        self.assert_same_results('t2-chassis-fe-graph.xml', os.path.join(self.test_dir, 't2-chassis-fe-port-config.ini'))
+
+    def test_multi_npu_graph(self):
+        self.assert_same_results(self.multi_npu_graph)
+        for asic in range(4):
+            port_config = os.path.join(self.test_dir, 'multi_npu_data', 'sample_port_config-{}.ini'.format(asic))
+            self.assert_same_results(self.multi_npu_graph, port_config, 'asic{}'.format(asic))
+
+    def test_asic_sub_role(self):
+        self.assertEqual(minigraph.parse_asic_sub_role(self.multi_npu_graph, 'asic0'), 'FrontEnd')
+        self.assertEqual(minigraph.parse_asic_sub_role(self.multi_npu_graph, 'asic2'), 'BackEnd')
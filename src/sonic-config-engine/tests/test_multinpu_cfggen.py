@@ -5,6 +5,8 @@ import os
 import json
 import yaml
 
+import cfggen_runner
+
 SKU = 'multi-npu-01'
 ASIC_SKU = 'multi-npu-asic'
 NUM_ASIC = 4
@@ -25,9 +27,9 @@ class TestMultiNpuCfgGen(TestCase):
     def run_script(self, argument, check_stderr=False):
         print '\n    Running sonic-cfggen ' + argument
         if check_stderr:
-            output = subprocess.check_output(self.script_file + ' ' + argument, stderr=subprocess.STDOUT, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument, merge_stderr=True)
         else:
-            output = subprocess.check_output(self.script_file + ' ' + argument, shell=True)
+            output = cfggen_runner.check_output(self.script_file, argument)
 
         linecount = output.strip().count('\n')
         if linecount <= 0:
@@ -245,3 +247,14 @@ class TestMultiNpuCfgGen(TestCase):
         argument = "-m {} -p {} -n asic3 --var-json \"ACL_TABLE\"".format(self.sample_graph, self.port_config[3])
         output = json.loads(self.run_script(argument))
         self.assertDictEqual(output, {})
+
+    def test_all_asics(self):
+        port_config = os.path.join(self.test_data_dir, "sample_port_config-{}.ini")
+        asics = ','.join('asic{}'.format(asic) for asic in range(NUM_ASIC))
+        template_dir = os.path.join(self.test_dir, '..', '..', '..', 'dockers', 'docker-fpm-frr', 'frr')
+        for argument in ["-m {} --print-data".format(self.sample_graph),
+                         "-m {} -v \"DEVICE_METADATA['localhost']['sub_role']\"".format(self.sample_graph),
+                         "-m {} -t {} -T {}".format(self.sample_graph, os.path.join(template_dir, 'zebra', 'zebra.conf.j2'), template_dir)]:
+            expected = ''.join(self.run_script_for_asic(argument, asic, self.port_config[asic]) for asic in range(NUM_ASIC))
+            output = self.run_script("{} --asics {} --jobs 2 -p {}".format(argument, asics, port_config))
+            self.assertEqual(output, expected)
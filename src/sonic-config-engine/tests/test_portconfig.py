@@ -0,0 +1,110 @@
+from unittest import TestCase
+import os
+import shutil
+import tempfile
+
+import portconfig
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', '..')
+
+
+def reference_parse_port_config_file(port_config_file):
+    """ The straightforward parser that parse_port_config_file must match """
+    ports = {}
+    port_alias_map = {}
+    port_alias_asic_map = {}
+    titles = ['name', 'lanes', 'alias', 'index']
+    with open(port_config_file) as f:
+        for line in f:
+            if line.startswith('#'):
+                if "name" in line:
+                    titles = line.strip('#').split()
+                continue
+            tokens = line.split()
+            if len(tokens) < 2:
+                continue
+            name_index = titles.index('name')
+            name = tokens[name_index]
+            data = {}
+            for i, item in enumerate(tokens):
+                if i == name_index:
+                    continue
+                data[titles[i]] = item
+            data.setdefault('alias', name)
+            ports[name] = data
+            port_alias_map[data['alias']] = name
+            if 'asic_port_name' in data and data['asic_port_name'] != name:
+                port_alias_map[data['asic_port_name']] = name
+            if 'asic_port_name' in data:
+                port_alias_asic_map[data['alias']] = data['asic_port_name'].strip()
+    return (ports, port_alias_map, port_alias_asic_map)
+
+
+class TestPortConfig(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.port_config = os.path.join(self.tmp_dir, 'port_config.ini')
+        self.write_port_config([
+            '# name  lanes  alias  asic_port_name',
+            'Ethernet0  0,1,2,3  etp1  Eth0-ASIC0',
+            'Ethernet4  4,5,6,7  etp2  Eth4-ASIC0'])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_port_config(self, lines):
+        with open(self.port_config, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def test_device_port_configs(self):
+        port_config_files = []
+        for root, _, files in os.walk(os.path.join(REPO_DIR, 'device')):
+            port_config_files.extend(os.path.join(root, f) for f in files if f == 'port_config.ini')
+        self.assertNotEqual(port_config_files, [])
+        for port_config_file in port_config_files:
+            # Compared as strings, as generated configs depend on the dict order
+            expected = str(reference_parse_port_config_file(port_config_file))
+            self.assertEqual(str(portconfig.parse_port_config_file(port_config_file)), expected, port_config_file)
+            self.assertEqual(str(portconfig.get_port_config(port_config_file=port_config_file)), expected, port_config_file)
+            self.assertEqual(str(portconfig.get_port_config(port_config_file=port_config_file)), expected, port_config_file)
+
+    def test_columns(self):
+        self.write_port_config([
+            '# alias  lanes  name',
+            'etp1  0,1  Ethernet0',
+            'etp2  2  Ethernet2  extra'])
+        self.assertRaises(IndexError, portconfig.parse_port_config_file, self.port_config)
+        self.write_port_config([
+            '# alias  lanes  name  speed',
+            'etp1  0,1  Ethernet0  40000',
+            'etp2  2  Ethernet2'])
+        (ports, port_alias_map, _) = portconfig.parse_port_config_file(self.port_config)
+        self.assertEqual(ports, {
+            'Ethernet0': {'alias': 'etp1', 'lanes': '0,1', 'speed': '40000'},
+            'Ethernet2': {'alias': 'etp2', 'lanes': '2'}})
+        self.assertEqual(port_alias_map, {'etp1': 'Ethernet0', 'etp2': 'Ethernet2'})
+
+    def test_memoized(self):
+        result = portconfig.get_port_config(port_config_file=self.port_config)
+        self.assertEqual(result[0]['Ethernet0']['alias'], 'etp1')
+
+        # Callers get their own copy of the port entries
+        result[0]['Ethernet0']['speed'] = '100000'
+        result[1].clear()
+        result = portconfig.get_port_config(port_config_file=self.port_config)
+        self.assertNotIn('speed', result[0]['Ethernet0'])
+        self.assertEqual(result[1]['etp1'], 'Ethernet0')
+
+        # The file is parsed again once it changed
+        self.write_port_config([
+            '# name  lanes  alias',
+            'Ethernet0  0,1,2,3  fortyGigE0/0'])
+        result = portconfig.get_port_config(port_config_file=self.port_config)
+        self.assertEqual(result, ({'Ethernet0': {'lanes': '0,1,2,3', 'alias': 'fortyGigE0/0'}}, {'fortyGigE0/0': 'Ethernet0'}, {}))
+
+    def test_port_name_by_alias(self):
+        self.assertEqual(portconfig.get_port_name_by_alias('etp2', port_config_file=self.port_config), 'Ethernet4')
+        self.assertEqual(portconfig.get_port_name_by_alias('Eth4-ASIC0', port_config_file=self.port_config), 'Ethernet4')
+        self.assertIsNone(portconfig.get_port_name_by_alias('etp3', port_config_file=self.port_config))
+        self.assertIsNone(portconfig.get_port_name_by_alias('etp1', hwsku='no-such-hwsku', platform='no-such-platform'))
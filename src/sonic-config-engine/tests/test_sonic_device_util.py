@@ -0,0 +1,152 @@
+from unittest import TestCase
+import json
+import os
+import shutil
+import tempfile
+
+import sonic_device_util
+
+PLATFORM = 'x86_64-fake_platform-r0'
+PATCHED = ['MACHINE_CONF_PATH', 'SONIC_VERSION_FILE', 'SONIC_DEVICE_PATH', 'PLATFORM_IDENTITY_FILE', 'read_system_mac', 'read_system_routing_stack']
+
+
+class TestPlatformIdentity(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saved = dict((name, getattr(sonic_device_util, name)) for name in PATCHED)
+        sonic_device_util.MACHINE_CONF_PATH = os.path.join(self.tmp_dir, 'host', 'machine.conf')
+        sonic_device_util.SONIC_VERSION_FILE = os.path.join(self.tmp_dir, 'sonic_version.yml')
+        sonic_device_util.SONIC_DEVICE_PATH = os.path.join(self.tmp_dir, 'device')
+        sonic_device_util.PLATFORM_IDENTITY_FILE = os.path.join(self.tmp_dir, 'run', 'sonic', 'platform_identity.json')
+        self.resolved = []
+        self.mac = '52:54:00:12:34:56'
+        self.routing_stack = 'frr'
+        sonic_device_util.read_system_mac = self.read_system_mac
+        sonic_device_util.read_system_routing_stack = self.read_system_routing_stack
+        sonic_device_util.clear_platform_identity()
+
+        os.makedirs(os.path.join(self.tmp_dir, 'host'))
+        os.makedirs(os.path.join(self.tmp_dir, 'device', PLATFORM))
+        self.write_file(sonic_device_util.MACHINE_CONF_PATH, 'onie_platform={}\nonie_machine=fake_machine\n'.format(PLATFORM))
+        self.write_file(sonic_device_util.SONIC_VERSION_FILE, "asic_type: 'broadcom'\n")
+        self.write_asic_conf(4)
+
+    def tearDown(self):
+        sonic_device_util.clear_platform_identity()
+        for name, value in self.saved.items():
+            setattr(sonic_device_util, name, value)
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, filename, content):
+        with open(filename, 'w') as f:
+            f.write(content)
+
+    def write_asic_conf(self, num_asic):
+        self.write_file(os.path.join(self.tmp_dir, 'device', PLATFORM, 'asic.conf'), 'NUM_ASIC={}\n'.format(num_asic))
+
+    def read_system_mac(self, namespace=None):
+        self.resolved.append(('mac', namespace))
+        return self.mac
+
+    def read_system_routing_stack(self):
+        self.resolved.append('routing_stack')
+        return self.routing_stack
+
+    def new_process(self):
+        """ Forget the in process cache, as a new process would """
+        sonic_device_util._platform_identity = None
+        sonic_device_util._machine_info_cache = None
+
+    def test_platform(self):
+        self.assertEqual(sonic_device_util.get_platform(), PLATFORM)
+        self.assertEqual(sonic_device_util.get_machine_info()['onie_machine'], 'fake_machine')
+        self.assertEqual(sonic_device_util.get_num_npus(), 4)
+        self.assertTrue(sonic_device_util.is_multi_npu())
+
+    def test_identity_file(self):
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.assertEqual(sonic_device_util.get_system_mac(namespace='asic0'), self.mac)
+        self.assertEqual(sonic_device_util.get_system_routing_stack(), 'frr')
+        self.assertEqual(sonic_device_util.get_num_npus(), 4)
+        with open(sonic_device_util.PLATFORM_IDENTITY_FILE) as f:
+            identity = json.load(f)
+        self.assertEqual(identity['platform'], PLATFORM)
+        self.assertEqual(identity['num_npus'], 4)
+        self.assertEqual(identity['system_mac'], self.mac)
+        self.assertEqual(identity['system_mac:asic0'], self.mac)
+        self.assertEqual(identity['routing_stack'], 'frr')
+
+        # Another process only reads the identity file
+        self.new_process()
+        self.resolved = []
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.assertIs(type(sonic_device_util.get_system_mac()), str)
+        self.assertEqual(sonic_device_util.get_system_mac(namespace='asic0'), self.mac)
+        self.assertEqual(sonic_device_util.get_system_routing_stack(), 'frr')
+        self.assertEqual(self.resolved, [])
+
+    def test_memoized(self):
+        for _ in range(3):
+            self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+            self.assertEqual(sonic_device_util.get_system_routing_stack(), 'frr')
+        self.assertEqual(self.resolved, [('mac', None), 'routing_stack'])
+
+        # Still served from memory once the identity file is gone
+        os.remove(sonic_device_util.PLATFORM_IDENTITY_FILE)
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.assertEqual(len(self.resolved), 2)
+
+    def test_unresolved_not_cached(self):
+        self.mac = None
+        self.routing_stack = ''
+        self.assertIsNone(sonic_device_util.get_system_mac())
+        self.assertEqual(sonic_device_util.get_system_routing_stack(), '')
+        self.mac = '52:54:00:12:34:57'
+        self.routing_stack = 'quagga'
+        self.assertEqual(sonic_device_util.get_system_mac(), '52:54:00:12:34:57')
+        self.assertEqual(sonic_device_util.get_system_routing_stack(), 'quagga')
+
+    def test_stale_asic_conf(self):
+        self.assertEqual(sonic_device_util.get_num_npus(), 4)
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.write_asic_conf(16)
+        self.assertEqual(sonic_device_util.get_num_npus(), 16)
+        # The whole identity is resolved again
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.assertEqual(self.resolved, [('mac', None), ('mac', None)])
+
+        os.remove(os.path.join(self.tmp_dir, 'device', PLATFORM, 'asic.conf'))
+        self.new_process()
+        self.assertEqual(sonic_device_util.get_num_npus(), 1)
+
+    def test_stale_machine_conf(self):
+        self.assertEqual(sonic_device_util.get_platform(), PLATFORM)
+        self.write_file(sonic_device_util.MACHINE_CONF_PATH, 'aboot_platform=x86_64-other_platform-r0\n')
+        self.new_process()
+        self.assertEqual(sonic_device_util.get_platform(), 'x86_64-other_platform-r0')
+        self.assertEqual(sonic_device_util.get_num_npus(), 1)
+
+        os.remove(sonic_device_util.MACHINE_CONF_PATH)
+        self.assertEqual(sonic_device_util.get_platform(), '')
+        self.assertIsNone(sonic_device_util.get_machine_info())
+
+    def test_stale_version(self):
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.write_file(sonic_device_util.SONIC_VERSION_FILE, "asic_type: 'mellanox'\n")
+        self.new_process()
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.assertEqual(self.resolved, [('mac', None), ('mac', None)])
+
+    def test_bad_identity_file(self):
+        self.assertEqual(sonic_device_util.get_num_npus(), 4)
+        for content in ['garbage', '[]', json.dumps({'version': 0, 'num_npus': 8})]:
+            self.write_file(sonic_device_util.PLATFORM_IDENTITY_FILE, content)
+            self.new_process()
+            self.assertEqual(sonic_device_util.get_num_npus(), 4)
+
+    def test_no_run_directory(self):
+        sonic_device_util.PLATFORM_IDENTITY_FILE = os.path.join(self.tmp_dir, 'host', 'machine.conf', 'platform_identity.json')
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.assertEqual(sonic_device_util.get_system_mac(), self.mac)
+        self.assertEqual(len(self.resolved), 1)
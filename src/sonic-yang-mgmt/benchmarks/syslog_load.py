@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Measure the logging overhead of loadData() on a large config.
+
+The synthetic config of benchmarks/xlate.py is loaded with loadData() in
+these cases:
+    no log          sysLog() does nothing, the reference
+    default         debug messages disabled, as in production
+    debug           debug messages enabled, --debug only
+    debug buffered  debug messages enabled and buffered by bufferLog(),
+                    --debug only
+The debug cases send a message per config entry and field to syslog. The
+translation (crop and xlate), which sends most of the messages, is also
+timed on its own. loadData() buffers its messages itself, so buffering
+only changes the time of the translation alone.
+
+Usage:
+    benchmarks/syslog_load.py [-n RUNS] [-p PORTS] [-r RULES] [--debug]
+                              [-y YANG_DIR]
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import time
+
+from xlate import YANG_DIR, load_models, make_config
+
+
+def measure(sy, config, runs, buffered):
+    load_times = []
+    xlate_times = []
+    for _ in range(runs):
+        start = time.time()
+        sy.loadData(copy.deepcopy(config))
+        load_times.append(time.time() - start)
+
+        sy.jIn = copy.deepcopy(config)
+        sy.xlateJson = dict()
+        sy.tablesWithOutYang = dict()
+        if buffered:
+            sy.bufferLog()
+        start = time.time()
+        sy._cropConfigDB()
+        sy._xlateConfigDB()
+        sy.flushLog()
+        xlate_times.append(time.time() - start)
+    return min(load_times), min(xlate_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the logging overhead of loadData")
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('-p', '--ports', type=int, default=512)
+    parser.add_argument('-r', '--rules', type=int, default=10000)
+    parser.add_argument('--debug', action='store_true', help='also measure with debug messages, they go to syslog')
+    parser.add_argument('-y', '--yang-dir', default=YANG_DIR)
+    args = parser.parse_args()
+
+    config = make_config(args.ports, args.rules)
+    entries = sum(len(table) for table in config.values())
+    sy = load_models(args.yang_dir)
+
+    cases = [('no log', False, False), ('default', False, False)]
+    if args.debug:
+        cases += [('debug', True, False), ('debug buffered', True, True)]
+
+    print('{} entries, {} runs'.format(entries, args.runs))
+    print('{:<16} {:>12} {:>12}'.format('case', 'loadData ms', 'xlate ms'))
+    for name, debug, buffered in cases:
+        sy.DEBUG = debug
+        if name == 'no log':
+            sy.sysLog = lambda *args, **kwargs: None
+        else:
+            sy.__dict__.pop('sysLog', None)
+        load_time, xlate_time = measure(sy, config, args.runs, buffered)
+        print('{:<16} {:>12.1f} {:>12.1f}'.format(name, load_time * 1000, xlate_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
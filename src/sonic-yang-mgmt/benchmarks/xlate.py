@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""Measure the translation of a large config DB to YANG JSON and back.
+
+The SONiC YANG models are loaded once, then a synthetic config DB is
+translated in two steps:
+    xlate       _xlateConfigDB(), config DB tables to YANG JSON
+    rev xlate   _revXlateConfigDB(), YANG JSON back to config DB tables
+The synthetic config has PORTS ports, half of them in VLANs (VLAN and
+VLAN_MEMBER), the other half routed (INTERFACE), and an ACL table with
+RULES rules (ACL_TABLE and ACL_RULE). The result of the reverse translation
+is checked against the input.
+
+Usage:
+    benchmarks/xlate.py [-n RUNS] [-p PORTS] [-r RULES] [-y YANG_DIR]
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+MGMT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+YANG_DIR = os.path.realpath(os.path.join(MGMT_DIR, '..', 'sonic-yang-models', 'yang-models'))
+sys.path.insert(0, MGMT_DIR)
+
+import sonic_yang
+
+PORTS_PER_VLAN = 32
+
+
+def make_config(ports, rules):
+    """ Return a synthetic config DB of ports ports and rules ACL rules """
+    config = {'PORT': {}, 'VLAN': {}, 'VLAN_MEMBER': {}, 'INTERFACE': {}, 'ACL_TABLE': {}, 'ACL_RULE': {}}
+    routed = []
+    for i in range(ports):
+        port = 'Ethernet{}'.format(i)
+        config['PORT'][port] = {
+            'alias': 'Eth{}/1'.format(i + 1),
+            'lanes': str(i),
+            'description': 'port {}'.format(i),
+            'speed': '100000',
+            'mtu': '9100',
+            'admin_status': 'up',
+        }
+        if i < ports // 2:
+            vlan = 'Vlan{}'.format(100 + i // PORTS_PER_VLAN)
+            if vlan not in config['VLAN']:
+                config['VLAN'][vlan] = {'vlanid': vlan[4:], 'description': vlan, 'admin_status': 'up', 'members': []}
+            config['VLAN'][vlan]['members'].append(port)
+            config['VLAN_MEMBER']['{}|{}'.format(vlan, port)] = {'tagging_mode': 'untagged'}
+        else:
+            routed.append(port)
+            config['INTERFACE'][port] = {}
+            config['INTERFACE']['{}|10.{}.{}.{}/31'.format(port, i // 32768 % 256, i // 128 % 256, i % 128 * 2)] = {}
+
+    config['ACL_TABLE']['DATAACL'] = {'type': 'L3', 'policy_desc': 'DATAACL', 'stage': 'INGRESS', 'ports': routed}
+    for i in range(rules):
+        config['ACL_RULE']['DATAACL|RULE_{}'.format(i)] = {
+            'PRIORITY': str(999999 - i),
+            'PACKET_ACTION': 'DROP' if i % 2 else 'FORWARD',
+            'IP_TYPE': 'IPv4ANY',
+            'SRC_IP': '10.{}.{}.0/24'.format(i // 256 % 256, i % 256),
+            'L4_DST_PORT': str(1024 + i % 60000),
+        }
+    return config
+
+
+def load_models(yang_dir):
+    sy = sonic_yang.SonicYang(yang_dir)
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            sy.loadYangModel()
+        finally:
+            sys.stdout = stdout
+    return sy
+
+
+def run_xlate(sy, config):
+    sy.jIn = copy.deepcopy(config)
+    sy.xlateJson = dict()
+    sy.tablesWithOutYang = dict()
+    sy._cropConfigDB()
+    start = time.time()
+    sy._xlateConfigDB()
+    return time.time() - start
+
+
+def run_rev_xlate(sy):
+    # as printed by libyang, which only prefixes the top level containers
+    sy.xlateJson = dict((top, dict((container.split(':')[-1], value) for container, value in containers.items()))
+                        for top, containers in sy.xlateJson.items())
+    sy.revXlateJson = dict()
+    start = time.time()
+    sy._revXlateConfigDB()
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the translation of a large config DB to YANG JSON")
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('-p', '--ports', type=int, default=512)
+    parser.add_argument('-r', '--rules', type=int, default=10000)
+    parser.add_argument('-y', '--yang-dir', default=YANG_DIR)
+    args = parser.parse_args()
+
+    config = make_config(args.ports, args.rules)
+    entries = sum(len(table) for table in config.values())
+    sy = load_models(args.yang_dir)
+
+    xlate_times = []
+    rev_xlate_times = []
+    for _ in range(args.runs):
+        xlate_times.append(run_xlate(sy, config))
+        rev_xlate_times.append(run_rev_xlate(sy))
+        if sy.revXlateJson != config:
+            print('Reverse translation differs from the input config', file=sys.stderr)
+            sys.exit(1)
+
+    print('{} entries, {} runs'.format(entries, args.runs))
+    print('{:<12} {:>12} {:>12}'.format('step', 'min ms', 'us/entry'))
+    for name, times in [('xlate', xlate_times), ('rev xlate', rev_xlate_times)]:
+        print('{:<12} {:>12.1f} {:>12.2f}'.format(name, min(times) * 1000, min(times) * 1e6 / entries))
+
+
+if __name__ == '__main__':
+    main()
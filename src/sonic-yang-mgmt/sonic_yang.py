@@ -3,7 +3,11 @@ import syslog
 
 from json import dump
 from glob import glob
-from sonic_yang_ext import SonicYangExtMixin, SonicYangException
+from sonic_yang_ext import SonicYangExtMixin, SonicYangException, \
+    YANG_SCHEMA_CACHE_DIR
+
+# buffered log messages are sent when there are this many
+SYSLOG_BUFFER_SIZE = 1000
 
 """
 Yang schema and data tree python APIs based on libyang python
@@ -12,8 +16,10 @@ i.e. it is mixin not parent class.
 """
 class SonicYang(SonicYangExtMixin):
 
-    def __init__(self, yang_dir, debug=False):
+    def __init__(self, yang_dir, debug=False, cache_dir=YANG_SCHEMA_CACHE_DIR):
         self.yang_dir = yang_dir
+        # directory of the schema cache, not used if it does not exist
+        self.cache_dir = cache_dir
         self.ctx = None
         self.module = None
         self.root = None
@@ -21,6 +27,8 @@ class SonicYang(SonicYangExtMixin):
         # logging vars
         self.SYSLOG_IDENTIFIER = "sonic_yang"
         self.DEBUG = debug
+        # messages kept by bufferLog() until flushLog(), None if not buffering
+        self.logBuffer = None
 
         # yang model files, need this map it to module
         self.yangFiles = list()
@@ -47,14 +55,62 @@ class SonicYang(SonicYangExtMixin):
     def __del__(self):
         pass
 
-    def sysLog(self, debug=syslog.LOG_INFO, msg=None):
+    """
+    sysLog(): log a message, msg is formatted with args only if the message
+    is logged, so callers should pass the values instead of formatting them.
+    Messages are prefixed with SYSLOG_IDENTIFIER instead of opening syslog
+    with it, which would change the identifier of the whole process.
+    """
+    def sysLog(self, debug=syslog.LOG_INFO, msg=None, *args):
 
         # log debug only if enabled
         if self.DEBUG == False and debug == syslog.LOG_DEBUG:
             return
-        syslog.openlog(self.SYSLOG_IDENTIFIER)
-        syslog.syslog(debug, msg)
-        syslog.closelog()
+        if args:
+            msg = msg.format(*args)
+        if self.logBuffer is not None:
+            self.logBuffer.append((debug, msg))
+            if len(self.logBuffer) >= SYSLOG_BUFFER_SIZE:
+                self._sendLog()
+            return
+        self._syslog(debug, msg)
+
+        return
+
+    """
+    bufferLog(): keep the log messages in memory until flushLog(), they are
+    sent in bursts of SYSLOG_BUFFER_SIZE messages.
+    """
+    def bufferLog(self):
+
+        if self.logBuffer is None:
+            self.logBuffer = list()
+
+        return
+
+    """
+    flushLog(): send the buffered log messages and stop buffering.
+    """
+    def flushLog(self):
+
+        if self.logBuffer is not None:
+            self._sendLog()
+            self.logBuffer = None
+
+        return
+
+    def _sendLog(self):
+
+        for debug, msg in self.logBuffer:
+            self._syslog(debug, msg)
+        del self.logBuffer[:]
+
+        return
+
+    def _syslog(self, debug, msg):
+
+        syslog.syslog(syslog.LOG_USER | debug, "{}: {}".format(\
+            self.SYSLOG_IDENTIFIER, msg))
 
         return
 
@@ -3,13 +3,34 @@
 
 from __future__ import print_function
 import yang as ly
+import hashlib
+import os
 import re
+import sys
 import syslog
+import tempfile
+import xmltodict
 
 from json import dump, dumps, loads
 from xmltodict import parse
 from glob import glob
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+# The JSON schema of the YANG models is cached in this directory, if it exists.
+# Entries are keyed by the hash of the YANG model files and of the versions
+# of the libraries which create them.
+YANG_SCHEMA_CACHE_DIR = '/var/cache/sonic/yang'
+YANG_SCHEMA_CACHE_MAX_ENTRIES = 4
+# Change when the content of a schema cache entry changes
+YANG_SCHEMA_CACHE_VERSION = 2
+# Schema cache entries loaded or created by this process, keyed like the files.
+# They are kept pickled, so each SonicYang loads its own copy of the entry.
+_schemaCache = dict()
+
 """
 This is the Exception thrown out of all public function of this class.
 """
@@ -27,6 +48,7 @@ class SonicYangExtMixin:
         try:
             # get all files
             self.yangFiles = glob(self.yang_dir +"/*.yang")
+            cacheKey = self._getSchemaCacheKey(self.yangFiles)
             # load yang modules
             for file in self.yangFiles:
                 m = self._load_schema_module(file)
@@ -41,10 +63,18 @@ class SonicYangExtMixin:
             print('Loaded below Yang Models')
             print(self.yangFiles)
 
-            # load json for each yang model
-            self._loadJsonYangModel()
-            # create a map from config DB table to yang container
-            self._createDBTableToModuleMap()
+            entry = self._loadSchemaCache(cacheKey)
+            if entry is not None:
+                self.yJson = entry['yJson']
+                self.confDbYangMap = entry['confDbYangMap']
+            else:
+                # load json for each yang model
+                self._loadJsonYangModel()
+                # create a map from config DB table to yang container
+                self._createDBTableToModuleMap()
+                # create the leaf dicts and key parsers used by translation
+                self._prepareYangModels()
+                self._storeSchemaCache(cacheKey)
 
         except Exception as e:
             print("Yang Models Load failed")
@@ -111,6 +141,137 @@ class SonicYangExtMixin:
                     }
         return
 
+    """
+    Create the leaf dict of every list and container of the config DB tables,
+    and the key parsers of every list. They are stored in the yang model
+    objects under keys __leafDict and __keyParser.
+    """
+    def _prepareYangModels(self):
+
+        def _prepare(model):
+            model['__leafDict'] = self._createLeafDict(model)
+            if 'ext:key-regex-configdb-to-yang' in model and \
+                'ext:key-regex-yang-to-configdb' in model:
+                model['__keyParser'] = self._createKeyParser(model)
+            for key in ['list', 'container']:
+                children = model.get(key)
+                if isinstance(children, dict):
+                    _prepare(children)
+                elif isinstance(children, list):
+                    for child in children:
+                        _prepare(child)
+            return
+
+        for cmap in self.confDbYangMap.values():
+            # common yang files have no container
+            if cmap.get('container') is not None:
+                _prepare(cmap['container'])
+
+        return
+
+    """
+    Hash of the yang model files, used as key of the schema cache. It covers
+    the name and content of each file, the cache format, the python version
+    and the versions of libyang and xmltodict.
+    """
+    def _getSchemaCacheKey(self, yangFiles):
+
+        sha = hashlib.sha256()
+        sha.update('{}\0{}\0{}\0{}\0'.format(YANG_SCHEMA_CACHE_VERSION, \
+            sys.version_info[0], self._getLibyangVersion(), \
+            xmltodict.__version__).encode())
+        for file in sorted(yangFiles):
+            sha.update(os.path.basename(file).encode('utf-8') + b'\0')
+            with open(file, 'rb') as f:
+                sha.update(f.read())
+            sha.update(b'\0')
+
+        return sha.hexdigest()
+
+    """
+    Version of the libyang python bindings. They carry no version number, so
+    it is made of the size and modification time of their files, which change
+    whenever libyang is upgraded.
+    """
+    def _getLibyangVersion(self):
+
+        version = getattr(ly, '__version__', '')
+        for module in [ly, getattr(ly, '_yang', None)]:
+            file = getattr(module, '__file__', None)
+            if file is None:
+                continue
+            try:
+                st = os.stat(file)
+            except OSError:
+                continue
+            version += ':{}:{}'.format(st.st_size, int(st.st_mtime))
+
+        return version
+
+    """
+    Return a copy of the schema cache entry with the given key, from this
+    process or from self.cache_dir, or None if there is none.
+    """
+    def _loadSchemaCache(self, key):
+
+        data = _schemaCache.get(key)
+        if data is not None:
+            self.sysLog(msg="Schema loaded from process cache")
+            return pickle.loads(data)
+
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, key + '.pickle'), 'rb') as f:
+                data = f.read()
+            entry = pickle.loads(data)
+        except Exception:
+            return None
+        _schemaCache[key] = data
+        self.sysLog(msg="Schema loaded from {}".format(self.cache_dir))
+
+        return entry
+
+    """
+    Store the JSON schema in the schema cache of this process, and atomically
+    write it in self.cache_dir if this directory exists. Only the most recent
+    YANG_SCHEMA_CACHE_MAX_ENTRIES files are kept. Write failures are ignored.
+    """
+    def _storeSchemaCache(self, key):
+
+        entry = {
+            'yJson': self.yJson,
+            'confDbYangMap': self.confDbYangMap
+        }
+        data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        _schemaCache[key] = data
+
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+        tmpFile = None
+        try:
+            (fd, tmpFile) = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmpFile, os.path.join(self.cache_dir, key + '.pickle'))
+            tmpFile = None
+
+            entries = [os.path.join(self.cache_dir, f) for f in \
+                os.listdir(self.cache_dir) if f.endswith('.pickle')]
+            entries.sort(key=os.path.getmtime, reverse=True)
+            for oldEntry in entries[YANG_SCHEMA_CACHE_MAX_ENTRIES:]:
+                os.remove(oldEntry)
+        except Exception as e:
+            self.sysLog(syslog.LOG_WARNING, "Can not write schema cache in {}: {}".\
+                format(self.cache_dir, e))
+            if tmpFile is not None:
+                try:
+                    os.remove(tmpFile)
+                except OSError:
+                    pass
+
+        return
+
     """
     Get module, topLevelContainer(TLC) and json container for a config DB table
     """
@@ -147,26 +308,62 @@ class SonicYangExtMixin:
 
         return
 
+    """
+    Create the key parser of a YANG list, used to extract the keys from a
+    Config DB key and to create a Config DB key from the keys.
+    Key parsers are created once when the yang models are loaded.
+
+    Return:
+    keyParser = {
+        "keyList": keys of the YANG list, i.e. ['vlan_name', 'ip-prefix'],
+        "keyRegEx": compiled regex from ext:key-regex-configdb-to-yang,
+        "revKeyList": keys in ext:key-regex-yang-to-configdb,
+        "revKeyParts": strings around the keys in ext:key-regex-yang-to-configdb
+    }
+    """
+    def _createKeyParser(self, model):
+
+        keyParser = model.get('__keyParser')
+        if keyParser is not None:
+            return keyParser
+
+        # fetch regex from YANG models.
+        keyRegEx = model['ext:key-regex-configdb-to-yang']['@value']
+        # seperator `|` has special meaning in regex, so change it appropriately.
+        keyRegEx = re.sub('\|', '\\|', keyRegEx)
+        # split "<vlan_name>|<ip-prefix>" in ['', 'vlan_name', '|', 'ip-prefix', '']
+        revKeyRegEx = re.split(r'<(.*?)>', \
+            model['ext:key-regex-yang-to-configdb']['@value'])
+        keyParser = {
+            "keyList": model['key']['@value'].split(),
+            "keyRegEx": re.compile(keyRegEx),
+            "revKeyList": revKeyRegEx[1::2],
+            "revKeyParts": revKeyRegEx[0::2]
+        }
+
+        return keyParser
+
     """
     Extract keys from table entry in Config DB and return in a dict
 
     Input:
     tableKey: Config DB Primary Key, Example tableKey = "Vlan111|2a04:5555:45:6709::1/64"
-    keys: key string from YANG list, i.e. 'vlan_name ip-prefix'.
-    regex: A regex to extract keys from tableKeys, good to have it as accurate as possible.
+    keyParser: key parser of the YANG list, see _createKeyParser().
 
     Return:
     KeyDict = {"vlan_name": "Vlan111", "ip-prefix": "2a04:5555:45:6709::1/64"}
     """
-    def _extractKey(self, tableKey, keys, regex):
+    def _extractKey(self, tableKey, keyParser):
 
-        keyList = keys.split()
         # get the value groups
-        value = re.match(regex, tableKey)
+        value = keyParser['keyRegEx'].match(tableKey)
+        if value is None:
+            raise Exception("Key {} does not match {}".format(tableKey, \
+                keyParser['keyRegEx'].pattern))
         # create the keyDict
         i = 1
         keyDict = dict()
-        for k in keyList:
+        for k in keyParser['keyList']:
             if value.group(i):
                 keyDict[k] = value.group(i)
             else:
@@ -206,6 +403,11 @@ class SonicYangExtMixin:
     """
     def _createLeafDict(self, model):
 
+        # leaf dicts are created once when the yang models are loaded
+        leafDict = model.get('__leafDict')
+        if leafDict is not None:
+            return leafDict
+
         leafDict = dict()
         #Iterate over leaf, choices and leaf-list.
         self._fillLeafDict(model.get('leaf'), leafDict)
@@ -271,25 +473,20 @@ class SonicYangExtMixin:
         #config DB to leaf in YANG LIST.
         leafDict = self._createLeafDict(model)
 
-        # fetch regex from YANG models.
-        keyRegEx = model['ext:key-regex-configdb-to-yang']['@value']
-        # seperator `|` has special meaning in regex, so change it appropriately.
-        keyRegEx = re.sub('\|', '\\|', keyRegEx)
-        # get keys from YANG model list itself
-        listKeys = model['key']['@value']
+        # regex and keys from YANG model list itself
+        keyParser = self._createKeyParser(model)
         self.sysLog(msg="xlateList regex:{} keyList:{}".\
-            format(keyRegEx, listKeys))
+            format(keyParser['keyRegEx'].pattern, model['key']['@value']))
 
         for pkey in config.keys():
             try:
                 vKey = None
-                self.sysLog(syslog.LOG_DEBUG, "xlateList Extract pkey:{}".\
-                    format(pkey))
+                self.sysLog(syslog.LOG_DEBUG, "xlateList Extract pkey:{}", pkey)
                 # Find and extracts key from each dict in config
-                keyDict = self._extractKey(pkey, listKeys, keyRegEx)
+                keyDict = self._extractKey(pkey, keyParser)
                 # fill rest of the values in keyDict
                 for vKey in config[pkey]:
-                    self.sysLog(syslog.LOG_DEBUG, "xlateList vkey {}".format(vKey))
+                    self.sysLog(syslog.LOG_DEBUG, "xlateList vkey {}", vKey)
                     keyDict[vKey] = self._findYangTypedValue(vKey, \
                                         config[pkey][vKey], leafDict)
                 yang.append(keyDict)
@@ -298,7 +495,7 @@ class SonicYangExtMixin:
 
             except Exception as e:
                 # log debug, because this exception may occur with multilists
-                self.sysLog(syslog.LOG_DEBUG, "xlateList Exception {}".format(e))
+                self.sysLog(syslog.LOG_DEBUG, "xlateList Exception {}", e)
                 # with multilist, we continue matching other keys.
                 continue
 
@@ -378,7 +575,7 @@ class SonicYangExtMixin:
         for vKey in configC.keys():
             #vkey must be a leaf\leaf-list\choice in container
             if leafDict.get(vKey):
-                self.sysLog(syslog.LOG_DEBUG, "xlateContainer vkey {}".format(vKey))
+                self.sysLog(syslog.LOG_DEBUG, "xlateContainer vkey {}", vKey)
                 yang[vKey] = self._findYangTypedValue(vKey, configC[vKey], leafDict)
                 # delete entry from copy of config
                 del configC[vKey]
@@ -430,23 +627,25 @@ class SonicYangExtMixin:
     """
     create config DB table key from entry in yang JSON
     """
-    def _createKey(self, entry, regex):
+    def _createKey(self, entry, keyParser):
 
         keyDict = dict()
-        keyV = regex
-        # get the keys from regex of key extractor
-        keyList = re.findall(r'<(.*?)>', regex)
-        for key in keyList:
+        # the key is revKeyParts, with the key values in between
+        parts = keyParser['revKeyParts']
+        keyV = [parts[0]]
+        i = 1
+        for key in keyParser['revKeyList']:
             val = entry.get(key)
             if val:
                 #print("pair: {} {}".format(key, val))
                 keyDict[key] = sval = str(val)
-                keyV = re.sub(r'<'+key+'>', sval, keyV)
-                #print("VAL: {} {}".format(regex, keyV))
+                keyV.append(sval)
+                keyV.append(parts[i])
             else:
                 raise Exception("key {} not found in entry".format(key))
+            i = i + 1
         #print("kDict {}".format(keyDict))
-        return keyV, keyDict
+        return ''.join(keyV), keyDict
 
     """
     Convert a string from Config DB value to Yang Value based on type of the
@@ -476,8 +675,9 @@ class SonicYangExtMixin:
     def _revXlateList(self, model, yang, config, table):
 
         # fetch regex from YANG models
-        keyRegEx = model['ext:key-regex-yang-to-configdb']['@value']
-        self.sysLog(msg="revXlateList regex:{}".format(keyRegEx))
+        keyParser = self._createKeyParser(model)
+        self.sysLog(msg="revXlateList regex:{}".format(\
+            model['ext:key-regex-yang-to-configdb']['@value']))
 
         # create a dict to map each key under primary key with a dict yang model.
         # This is done to improve performance of mapping from values of TABLEs in
@@ -488,8 +688,8 @@ class SonicYangExtMixin:
         if "_LIST" in model['@name']:
             for entry in yang:
                 # create key of config DB table
-                pkey, pkeydict = self._createKey(entry, keyRegEx)
-                self.sysLog(syslog.LOG_DEBUG, "revXlateList pkey:{}".format(pkey))
+                pkey, pkeydict = self._createKey(entry, keyParser)
+                self.sysLog(syslog.LOG_DEBUG, "revXlateList pkey:{}", pkey)
                 config[pkey]= dict()
                 # fill rest of the entries
                 for key in entry:
@@ -551,7 +751,7 @@ class SonicYangExtMixin:
         for vKey in yang:
             #vkey must be a leaf\leaf-list\choice in container
             if leafDict.get(vKey):
-                self.sysLog(syslog.LOG_DEBUG, "revXlateContainer vkey {}".format(vKey))
+                self.sysLog(syslog.LOG_DEBUG, "revXlateContainer vkey {}", vKey)
                 config[vKey] = self._revFindYangTypedValue(vKey, yang[vKey], leafDict)
 
         return
@@ -674,11 +874,14 @@ class SonicYangExtMixin:
 
     """
     load_data: load Config DB, crop, xlate and create data tree from it. (Public)
+    The log messages of the translation are buffered, see bufferLog().
     input:    data
     returns:  True - success   False - failed
     """
     def loadData(self, configdbJson):
 
+       buffered = self.logBuffer is not None
+       self.bufferLog()
        try:
           self.jIn = configdbJson
           # reset xlate and tablesWithOutYang
@@ -697,14 +900,22 @@ class SonicYangExtMixin:
            self.root = None
            print("Data Loading Failed")
            raise SonicYangException("Data Loading Failed\n{}".format(str(e)))
+       finally:
+           # keep buffering if the caller asked for it
+           if not buffered:
+               self.flushLog()
 
        return True
 
     """
-    Get data from Data tree, data tree will be assigned in self.xlateJson. (Public)
+    Get data from Data tree, data tree will be assigned in self.xlateJson.
+    The log messages of the reverse translation are buffered, see
+    bufferLog(). (Public)
     """
     def getData(self):
 
+        buffered = self.logBuffer is not None
+        self.bufferLog()
         try:
             self.xlateJson = loads(self._print_data_mem('JSON'))
             # reset reverse xlate
@@ -715,6 +926,9 @@ class SonicYangExtMixin:
         except Exception as e:
             print("Get Data Tree Failed")
             raise SonicYangException("Get Data Tree Failed\n{}".format(str(e)))
+        finally:
+            if not buffered:
+                self.flushLog()
 
         return self.revXlateJson
 
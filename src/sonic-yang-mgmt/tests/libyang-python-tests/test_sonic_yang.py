@@ -2,9 +2,13 @@ import sys
 import os
 import pytest
 import sonic_yang as sy
+import sonic_yang_ext as sy_ext
 import json
 import glob
 import logging
+import shutil
+import syslog
+import tempfile
 from ijson import items as ijson_itmes
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -320,5 +324,140 @@ class Test_SonicYang(object):
 
         return
 
+    def test_schema_cache(self, sonic_yang_data):
+        # in this test, the JSON schema of the yang models is loaded from the
+        # schema cache, by other processes and by this one.
+        yang_dir = sonic_yang_data['yang_dir']
+        syc = sonic_yang_data['syc']
+        cache_dir = tempfile.mkdtemp()
+        try:
+            sy_ext._schemaCache.clear()
+            syc_cached = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+            syc_cached.loadYangModel()
+            assert len(glob.glob(cache_dir + "/*.pickle")) == 1
+
+            # as in a new process
+            sy_ext._schemaCache.clear()
+            syc_file = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+            syc_file.loadYangModel()
+            syc_process = sy.SonicYang(yang_dir, cache_dir=None)
+            syc_process.loadYangModel()
+            # each instance has its own copy of the entry
+            leafDict = syc_process.confDbYangMap['PORT']['container']['list']\
+                ['__leafDict']
+            assert leafDict is not syc_file.confDbYangMap['PORT']\
+                ['container']['list']['__leafDict']
+            leafDict['mtu']['type']['@name'] = 'string'
+            del syc_process.confDbYangMap['PORT']
+            syc_again = sy.SonicYang(yang_dir, cache_dir=None)
+            syc_again.loadYangModel()
+            assert syc_again.confDbYangMap['PORT']['container']['list']\
+                ['__leafDict']['mtu']['type']['@name'] == 'uint16'
+
+            for s in [syc_cached, syc_file]:
+                assert sorted(s.confDbYangMap.keys()) == \
+                    sorted(syc.confDbYangMap.keys())
+                # compiled key regexes are compared by their pattern
+                assert json.dumps(s.yJson, sort_keys=True, \
+                    default=lambda r: r.pattern) == json.dumps(syc.yJson, \
+                    sort_keys=True, default=lambda r: r.pattern)
+                assert s.ctx.get_module('sonic-port') is not None
+
+            # the key changes with the version of the libraries
+            yangFiles = glob.glob(yang_dir + "/*.yang")
+            key = syc._getSchemaCacheKey(yangFiles)
+            assert syc._getSchemaCacheKey(yangFiles) == key
+            version = sy_ext.xmltodict.__version__
+            try:
+                sy_ext.xmltodict.__version__ = version + '.1'
+                assert syc._getSchemaCacheKey(yangFiles) != key
+            finally:
+                sy_ext.xmltodict.__version__ = version
+        finally:
+            shutil.rmtree(cache_dir)
+
+        return
+
+    def test_key_parser(self, sonic_yang_data):
+        # in this test, keys are extracted from config DB keys and config DB
+        # keys are created from keys with the key parser of a yang list.
+        syc = sonic_yang_data['syc']
+        module, topc, container = syc._getModuleTLCcontainer('VLAN_INTERFACE')
+        model = syc._findYangList(container, 'VLAN_INTERFACE_IPPREFIX_LIST')
+        keyParser = model['__keyParser']
+        assert syc._createKeyParser(model) is keyParser
+
+        keyDict = syc._extractKey('Vlan111|2a04:5555:45:6709::1/64', keyParser)
+        assert keyDict == {'vlan_name': 'Vlan111', \
+            'ip-prefix': '2a04:5555:45:6709::1/64'}
+        keyDict['family'] = 'IPv6'
+        assert syc._createKey(keyDict, keyParser) == \
+            ('Vlan111|2a04:5555:45:6709::1/64', {'vlan_name': 'Vlan111', \
+            'ip-prefix': '2a04:5555:45:6709::1/64'})
+
+        with pytest.raises(Exception):
+            syc._extractKey('Ethernet0|10.0.0.0/31', keyParser)
+        with pytest.raises(Exception):
+            syc._createKey({'vlan_name': 'Vlan111'}, keyParser)
+
+        # the key of every list entry of the sample config is given back
+        # by the key parser of the yang list it belongs to
+        jIn = json.loads(self.readIjsonInput(sonic_yang_data['test_file'], \
+            'SAMPLE_CONFIG_DB_JSON'))
+        for table in jIn:
+            if table not in syc.confDbYangMap:
+                continue
+            module, topc, container = syc._getModuleTLCcontainer(table)
+            models = container.get('list', [])
+            if isinstance(models, dict):
+                models = [models]
+            for key in jIn[table]:
+                keys = set()
+                for model in models:
+                    keyParser = syc._createKeyParser(model)
+                    try:
+                        keyDict = syc._extractKey(key, keyParser)
+                    except Exception:
+                        # key of another list of the table
+                        continue
+                    keys.add(syc._createKey(keyDict, keyParser)[0])
+                assert keys == set([key]) or not models
+
+        return
+
+    def test_buffer_log(self, sonic_yang_data, monkeypatch):
+        # in this test, log messages are formatted only if they are logged,
+        # and kept in memory until flushLog() when buffered, as they are by
+        # loadData(). They are sent with a prefix, syslog is not opened.
+        test_file = sonic_yang_data['test_file']
+        syc = sonic_yang_data['syc']
+        sent = list()
+        monkeypatch.setattr(syslog, 'syslog', lambda priority, msg: \
+            sent.append((priority, msg, syc.logBuffer is not None)))
+        monkeypatch.setattr(syslog, 'openlog', None)
+
+        syc.bufferLog()
+        try:
+            syc.sysLog(syslog.LOG_DEBUG, "not logged {}", 1)
+            syc.sysLog(syslog.LOG_INFO, "logged {} {}", 1, "time")
+            syc.sysLog(msg="logged {}")
+            assert syc.logBuffer == [(syslog.LOG_INFO, "logged 1 time"), \
+                (syslog.LOG_INFO, "logged {}")]
+            assert sent == []
+        finally:
+            syc.flushLog()
+        assert syc.logBuffer is None
+        assert sent == [ \
+            (syslog.LOG_USER|syslog.LOG_INFO, "sonic_yang: logged 1 time", True), \
+            (syslog.LOG_USER|syslog.LOG_INFO, "sonic_yang: logged {}", True)]
+
+        del sent[:]
+        jIn = self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON')
+        syc.loadData(json.loads(jIn))
+        assert syc.logBuffer is None
+        assert len(sent) and all(buffered for _, _, buffered in sent)
+
+        return
+
     def teardown_class(self):
         pass